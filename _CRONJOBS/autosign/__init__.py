@@ -0,0 +1,14 @@
+"""API 站點自動簽到套件（New-API、Veloera 及其他 fork）。
+
+一個行程內跑完所有已設定站點的所有帳號：共用設定載入、HTTP 連線池（cronkit.transport）、
+FlareSolverr session / clearance 快取與結果報告。
+
+用法（於 _CRONJOBS 目錄）：
+    python -m autosign                 # 所有有帳號設定的站點
+    python -m autosign --site newapi   # 只跑指定站點，可重複指定
+
+舊入口 new_api_sign/checkin.py、veloera_sign/checkin.py 仍可使用，等同 --site newapi / --site veloera。
+
+新增站點：在 sites.py 繼承 Site（或現有站點類別），設定 name / env_prefix / checkin_path 等屬性，
+必要時覆寫 checkin()，並以 @register 註冊即可。
+"""
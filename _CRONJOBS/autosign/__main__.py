@@ -0,0 +1,5 @@
+import sys
+
+from autosign.runner import main
+
+sys.exit(main())
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""Cloudflare clearance 處理：FlareSolverr session 池 + 本地 clearance 快取。
+
+- FlareSolverrPool：以站點 origin 為 key，每個 origin 只建立一個瀏覽器 session 並解一次 clearance，
+  同 origin 所有帳號共用；session 逾時或被站點拒絕時重建，close() 時全部銷毀。
+- ClearanceCache：把 clearance（cookies + User-Agent + 到期時間）依 origin 存到檔案，
+  下次執行可先直接帶 cookie POST，省去 10–60 秒的瀏覽器挑戰。
+"""
+
+import json
+import os
+import threading
+from time import monotonic, time
+from typing import Dict, List, Optional
+
+from autosign.common import DEFAULT_UA, host_of, log
+from cronkit.metrics import labels, phase
+from cronkit.transport import default_transport
+
+CLEARANCE_DEFAULT_TTL = 30 * 60
+CLEARANCE_EXPIRY_MARGIN = 5 * 60
+
+
+def clearance_expiry(cookies_list: List[dict]) -> float:
+    """以 cf_clearance 的到期時間為準，缺少時給預設 TTL。"""
+    now = time()
+    for cookie in cookies_list:
+        if cookie.get('name') == 'cf_clearance':
+            expires = cookie.get('expiry') or cookie.get('expires')
+            if isinstance(expires, (int, float)) and expires > now:
+                return float(expires) - CLEARANCE_EXPIRY_MARGIN
+    return now + CLEARANCE_DEFAULT_TTL
+
+
+class FlareSolverrSession:
+    """已通過 Cloudflare 挑戰的 FlareSolverr 瀏覽器 session。"""
+
+    def __init__(self, session_id: str, user_agent: str, cookies: List[dict]):
+        self.session_id = session_id
+        self.user_agent = user_agent
+        self.cookies = cookies
+        self.created = monotonic()
+        # FlareSolverr 的單一瀏覽器 session 不適合同時處理多個請求
+        self.lock = threading.Lock()
+
+    def clearance(self) -> dict:
+        """轉成可寫入 ClearanceCache 的項目。"""
+        return {
+            'cookies': [
+                {
+                    'name': cookie.get('name'),
+                    'value': cookie.get('value'),
+                    'domain': cookie.get('domain'),
+                    'path': cookie.get('path', '/'),
+                }
+                for cookie in self.cookies
+            ],
+            'user_agent': self.user_agent,
+            'expires': clearance_expiry(self.cookies),
+        }
+
+
+class FlareSolverrPool:
+    """以站點 origin 為 key 的 FlareSolverr session 池。"""
+
+    SESSION_TTL = 25 * 60
+
+    def __init__(self, flaresolverr_url: str):
+        self.flaresolverr_url = flaresolverr_url.rstrip('/')
+        self._lock = threading.Lock()
+        self._origin_locks: Dict[str, threading.Lock] = {}
+        self._sessions: Dict[str, FlareSolverrSession] = {}
+        self.created = 0
+
+    def command(self, payload: dict, timeout: int) -> dict:
+        """呼叫 FlareSolverr /v1；每個指令記錄為 flaresolverr.<cmd> 階段（http_status 為目標站點狀態）。"""
+        with phase(f"flaresolverr.{payload['cmd']}") as rec:
+            r = default_transport().post(f"{self.flaresolverr_url}/v1", json=payload, timeout=timeout, verify=False)
+            rec["http_status"] = r.status_code
+            r.raise_for_status()
+            data = r.json()
+            solution = data.get("solution") or {}
+            if "status" in solution:
+                rec["http_status"] = solution["status"]
+            if data.get("status") != "ok":
+                rec["outcome"] = "error"
+                rec["error"] = data.get("message")
+            return data
+
+    def _origin_lock(self, origin: str) -> threading.Lock:
+        with self._lock:
+            return self._origin_locks.setdefault(origin, threading.Lock())
+
+    def acquire(self, origin: str) -> Optional[FlareSolverrSession]:
+        """取得 origin 的有效 session；不存在或已逾時則建立並取得 clearance。"""
+        with self._origin_lock(origin):
+            sess = self._sessions.get(origin)
+            if sess and monotonic() - sess.created < self.SESSION_TTL:
+                return sess
+            if sess:
+                log(f"ℹ️ FlareSolverr session 已逾時，重建: {origin}")
+                self._drop(origin, sess)
+            sess = self._solve(origin)
+            if sess:
+                self._sessions[origin] = sess
+            return sess
+
+    def _solve(self, origin: str) -> Optional[FlareSolverrSession]:
+        data = self.command({"cmd": "sessions.create"}, timeout=20)
+        session_id = data.get("session")
+        if not session_id:
+            log("❌ FlareSolverr 未返回 session")
+            return None
+        self.created += 1
+        log(f"ℹ️ FlareSolverr session 建立: {session_id} ({origin})")
+
+        try:
+            data = self.command(
+                {"cmd": "request.get", "url": origin, "session": session_id, "maxTimeout": 60000},
+                timeout=70,
+            )
+        except Exception:
+            self._destroy(session_id)
+            raise
+        if data.get("status") != "ok":
+            log(f"❌ FlareSolverr get 狀態非 ok: {data}")
+            self._destroy(session_id)
+            return None
+        solution = data.get("solution", {})
+        user_agent = solution.get("userAgent") or DEFAULT_UA
+        cookies = solution.get("cookies", [])
+        log(f"ℹ️ clearance HTTP {solution.get('status')}, UA: {user_agent}, cookies: {len(cookies)}")
+        return FlareSolverrSession(session_id, user_agent, cookies)
+
+    def invalidate(self, origin: str, sess: FlareSolverrSession) -> None:
+        """丟棄失效的 session；若其他執行緒已換新則不動作。"""
+        with self._origin_lock(origin):
+            self._drop(origin, sess)
+
+    def _drop(self, origin: str, sess: FlareSolverrSession) -> None:
+        if self._sessions.get(origin) is sess:
+            del self._sessions[origin]
+            self._destroy(sess.session_id)
+
+    def _destroy(self, session_id: str) -> None:
+        try:
+            self.command({"cmd": "sessions.destroy", "session": session_id}, timeout=10)
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.items())
+            self._sessions.clear()
+        for origin, sess in sessions:
+            with labels(host=host_of(origin)):
+                self._destroy(sess.session_id)
+        if self.created:
+            log(f"ℹ️ FlareSolverr session 共建立 {self.created} 次，已全部銷毀")
+
+
+class ClearanceCache:
+    """依 origin 保存 clearance 的檔案快取：{origin: {cookies, user_agent, expires}}"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+
+    def load(self) -> None:
+        """讀取快取並丟棄已過期項目。"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            log(f"⚠️ clearance 快取讀取失敗，忽略: {e}")
+            return
+        now = time()
+        with self._lock:
+            self._entries = {
+                origin: entry for origin, entry in cache.items()
+                if isinstance(entry, dict) and entry.get('expires', 0) > now
+            }
+        if self._entries:
+            log(f"ℹ️ 載入 {len(self._entries)} 個站點的 clearance 快取")
+
+    def save(self) -> None:
+        """有變動時原子寫入快取（內含 cookie，權限 600）。"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = dict(self._entries)
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log(f"⚠️ clearance 快取寫入失敗: {e}")
+
+    def get(self, origin: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(origin)
+        if entry and entry.get('expires', 0) > time():
+            return entry
+        return None
+
+    def put(self, origin: str, entry: dict) -> None:
+        with self._lock:
+            self._entries[origin] = entry
+            self._dirty = True
+
+    def drop(self, origin: str, entry: Optional[dict] = None) -> None:
+        """移除 origin 的快取；指定 entry 時只在仍是同一筆時移除。"""
+        with self._lock:
+            if entry is None or self._entries.get(origin) is entry:
+                self._dirty |= self._entries.pop(origin, None) is not None
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""日誌、回應解析等各站點共用的小工具。"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional
+from urllib.parse import urlparse
+
+DEFAULT_UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/122.0.0.0 Safari/537.36"
+)
+
+# _CRONJOBS 目錄（各站點 config.json 與共用套件所在）
+CRONJOBS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_log_context = threading.local()
+_print_lock = threading.Lock()
+
+
+def log(msg: str) -> None:
+    tag = getattr(_log_context, "tag", "")
+    prefix = f"[{tag}] " if tag else ""
+    with _print_lock:
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {prefix}{msg}", flush=True)
+
+
+@contextmanager
+def log_tag(tag: str) -> Iterator[None]:
+    """在區塊內為本執行緒的 log 加上 [tag] 前綴（並行執行時區分帳號）。"""
+    previous = getattr(_log_context, "tag", "")
+    _log_context.tag = tag
+    try:
+        yield
+    finally:
+        _log_context.tag = previous
+
+
+def record_detail(**detail) -> None:
+    """記下本執行緒目前帳號的簽到細節（quota、message），由 runner 取走寫入帳本。"""
+    current = getattr(_log_context, "detail", None)
+    if current is None:
+        current = _log_context.detail = {}
+    current.update(detail)
+
+
+def pop_detail() -> dict:
+    detail = getattr(_log_context, "detail", None) or {}
+    _log_context.detail = None
+    return detail
+
+
+def truncate(text: str, length: int = 400) -> str:
+    if text is None:
+        return ""
+    return text[:length] + ("…" if len(text) > length else "")
+
+
+def parse_api_response(body: str) -> Optional[dict]:
+    try:
+        data = json.loads(body)
+    except Exception:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def is_already_signed(message: str) -> bool:
+    return "已" in message and "签" in message
+
+
+def is_cloudflare_block(http_status: Optional[int], body: str) -> bool:
+    """403/503 且內容為 Cloudflare 挑戰頁（而非站點自己的 JSON 錯誤）。"""
+    return http_status in (403, 503) and "cloudflare" in (body or "").lower()
+
+
+def env_int(name: str, default: int, minimum: int = 1) -> int:
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(minimum, int(raw))
+    except ValueError:
+        log(f"⚠️ {name}={raw!r} 非整數，使用預設值 {default}")
+        return default
+
+
+def origin_of(base_url: str) -> str:
+    parsed = urlparse(base_url)
+    return f"{parsed.scheme}://{parsed.netloc}".lower() if parsed.netloc else base_url.rstrip('/')
+
+
+def host_of(base_url: str) -> str:
+    return urlparse(base_url).netloc.lower() or base_url
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""單次執行期間各站點共用的狀態（FlareSolverr session 池、clearance 快取、每日帳本）。"""
+
+import os
+import threading
+from typing import Optional
+
+from autosign.clearance import ClearanceCache, FlareSolverrPool
+from autosign.common import log
+from autosign.ledger import Ledger, today
+
+DEFAULT_FLARESOLVERR_URL = "http://localhost:8191"
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".state")
+
+
+class RunContext:
+    """一次執行的共用資源；以 with 使用，結束時銷毀 session 並寫回快取。
+
+    - flaresolverr_url：FLARESOLVERR_URL，空字串表示未設定（New-API 改走直連）
+    - state_dir：AUTOSIGN_STATE_DIR，存放 clearance 快取、每日帳本等跨次執行的狀態
+      （GitHub Actions 需以 actions/cache 保存此目錄）
+    """
+
+    def __init__(self, flaresolverr_url: str = "", state_dir: str = DEFAULT_STATE_DIR):
+        self.flaresolverr_url = flaresolverr_url.strip()
+        self.state_dir = state_dir
+        self.clearance = ClearanceCache(
+            os.environ.get("AUTOSIGN_CLEARANCE_CACHE", "").strip()
+            or os.path.join(state_dir, "clearance.json")
+        )
+        self.ledger_path = (
+            os.environ.get("AUTOSIGN_LEDGER", "").strip() or os.path.join(state_dir, "ledger.sqlite3")
+        )
+        self.ledger: Optional[Ledger] = None
+        self.day = today()
+        self._pool: Optional[FlareSolverrPool] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RunContext":
+        return cls(
+            flaresolverr_url=os.environ.get("FLARESOLVERR_URL", ""),
+            state_dir=os.environ.get("AUTOSIGN_STATE_DIR", "").strip() or DEFAULT_STATE_DIR,
+        )
+
+    @property
+    def flaresolverr_configured(self) -> bool:
+        return bool(self.flaresolverr_url)
+
+    @property
+    def flaresolverr(self) -> FlareSolverrPool:
+        """整次執行共用的 FlareSolverr session 池（首次使用時建立）。"""
+        with self._lock:
+            if self._pool is None:
+                url = self.flaresolverr_url or DEFAULT_FLARESOLVERR_URL
+                log(f"ℹ️ 將使用 FlareSolverr: {url}")
+                self._pool = FlareSolverrPool(url)
+            return self._pool
+
+    def __enter__(self) -> "RunContext":
+        self.clearance.load()
+        self.ledger = Ledger(self.ledger_path)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._pool:
+            self._pool.close()
+        self.clearance.save()
+        if self.ledger:
+            self.ledger.close()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""每日簽到帳本（SQLite）。
+
+以 (day, site, base_url, user_id) 記錄當日最後結果與回傳的 quota，
+執行前先查帳本：當日已成功的帳號完全不發任何網路請求，重跑只會處理真正失敗的帳號。
+`python -m autosign --status` 只讀帳本即可列出當日狀態。
+
+「日」以 AUTOSIGN_TZ 時區計算（預設 Asia/Taipei，與站點的每日重置時間一致）。
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Optional
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9：退回系統時區
+    ZoneInfo = None
+    ZoneInfoNotFoundError = LookupError
+
+DEFAULT_TZ = "Asia/Taipei"
+
+SCHEMA = """
+create table if not exists checkins (
+    day        text not null,
+    site       text not null,
+    base_url   text not null,
+    user_id    text not null,
+    status     text not null,
+    quota      text,
+    message    text,
+    updated_at text not null,
+    primary key (day, site, base_url, user_id)
+)
+"""
+
+
+def today(tz_name: str = "") -> str:
+    """AUTOSIGN_TZ 時區的當日日期；沒有 zoneinfo 或找不到時區資料（未裝 tzdata）時退回系統時區。"""
+    tz_name = tz_name or os.environ.get("AUTOSIGN_TZ", "").strip() or DEFAULT_TZ
+    if ZoneInfo:
+        try:
+            return datetime.now(ZoneInfo(tz_name)).strftime("%Y-%m-%d")
+        except (ZoneInfoNotFoundError, ValueError):  # ValueError：時區名稱格式不合法
+            pass
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+class Ledger:
+    """執行緒安全的 SQLite 帳本；同一連線以 lock 序列化存取。"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute(SCHEMA)
+
+    def get(self, day: str, site: str, base_url: str, user_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "select * from checkins where day = ? and site = ? and base_url = ? and user_id = ?",
+                (day, site, base_url, str(user_id)),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def record(
+        self,
+        day: str,
+        site: str,
+        base_url: str,
+        user_id: str,
+        status: str,
+        quota: Optional[object] = None,
+        message: Optional[str] = None,
+    ) -> None:
+        """寫入當日結果；已成功的紀錄不會被之後的失敗覆蓋。"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                insert into checkins (day, site, base_url, user_id, status, quota, message, updated_at)
+                values (?, ?, ?, ?, ?, ?, ?, ?)
+                on conflict (day, site, base_url, user_id) do update set
+                    status = excluded.status,
+                    quota = coalesce(excluded.quota, checkins.quota),
+                    message = excluded.message,
+                    updated_at = excluded.updated_at
+                where checkins.status != 'ok' or excluded.status = 'ok'
+                """,
+                (
+                    day, site, base_url, str(user_id), status,
+                    None if quota is None else str(quota), message,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""帳號登錄：從環境變數、帳號檔（JSONL / SQLite）與 config.json 串流讀出帳號。
+
+來源（可同時使用）：
+1. 帳號檔 --accounts / AUTOSIGN_ACCOUNTS，適合上千個帳號：
+   - *.jsonl：每行一個 {"site": "newapi", "base_url": ..., "user_id": ..., "access_token": ...}
+   - *.sqlite / *.sqlite3 / *.db：資料表 accounts(site, base_url, user_id, access_token[, enabled])
+2. 環境變數 <env_prefix>*（含 SECRETS_CONTEXT 中的同名項，GitHub Actions secrets 傳入）
+3. 站點目錄下的 config.json（僅當該站點在上述來源都沒有帳號時使用）
+
+所有來源統一在 validate() 驗證與正規化一次，並以 (site, base_url, user_id) 去重（先出現者優先）。
+--shard i/n（0 ≤ i < n）依 (base_url, user_id) 的穩定雜湊分片，多個 runner 各跑一片且不重疊。
+"""
+
+import json
+import os
+import sqlite3
+import zlib
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from autosign.common import CRONJOBS_DIR, log
+
+REQUIRED_FIELDS = ("base_url", "user_id", "access_token")
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+# (site 名稱, 未驗證的帳號設定, 來源描述)；來源如 "accounts.jsonl:12"、"環境變數 NEWAPI_X"，只用於記錄訊息
+RawAccount = Tuple[str, object, str]
+
+
+def parse_shard(spec: str) -> Optional[Tuple[int, int]]:
+    """解析 "i/n"；空字串表示不分片。"""
+    if not spec:
+        return None
+    try:
+        index, total = (int(part) for part in spec.split("/", 1))
+    except ValueError:
+        raise ValueError(f"--shard 格式應為 i/n: {spec!r}")
+    if total < 1 or not 0 <= index < total:
+        raise ValueError(f"--shard 超出範圍（0 <= i < n）: {spec!r}")
+    return index, total
+
+
+def in_shard(cfg: dict, shard: Optional[Tuple[int, int]]) -> bool:
+    if not shard:
+        return True
+    index, total = shard
+    key = f"{cfg['base_url']}\0{cfg['user_id']}".encode("utf-8")
+    return zlib.crc32(key) % total == index
+
+
+def validate(site_name: str, cfg: object, source: str, sites: Dict[str, object]) -> Optional[dict]:
+    """驗證並正規化單一帳號；不合格時記錄原因並回傳 None。"""
+    if site_name not in sites:
+        log(f"⚠️ {source} 站點 {site_name!r} 未啟用或不存在，略過")
+        return None
+    if not isinstance(cfg, dict):
+        log(f"⚠️ {source} 不是 JSON 物件，略過")
+        return None
+    missing = [k for k in REQUIRED_FIELDS if cfg.get(k) is None or not str(cfg[k]).strip()]
+    if missing:
+        log(f"⚠️ {source} 缺少必要欄位: {', '.join(missing)}")
+        return None
+    base_url = str(cfg["base_url"]).strip().rstrip('/')
+    if not base_url.startswith(("http://", "https://")):
+        log(f"⚠️ {source} base_url 不是 http(s) 網址: {base_url}")
+        return None
+    account = {k: v for k, v in cfg.items() if k != "site"}
+    account.update(base_url=base_url, user_id=str(cfg["user_id"]).strip(), access_token=str(cfg["access_token"]).strip())
+    return account
+
+
+def _jsonl_accounts(path: str) -> Iterator[RawAccount]:
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            source = f"{os.path.basename(path)}:{lineno}"
+            try:
+                cfg = json.loads(line)
+            except json.JSONDecodeError as e:
+                log(f"❌ {source} 解析失敗: {e}")
+                continue
+            yield (cfg.get("site", "") if isinstance(cfg, dict) else "", cfg, source)
+
+
+def _sqlite_accounts(path: str) -> Iterator[RawAccount]:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        columns = {row["name"] for row in conn.execute("pragma table_info(accounts)")}
+        where = " where coalesce(enabled, 1) != 0" if "enabled" in columns else ""
+        for row in conn.execute(f"select rowid, * from accounts{where} order by rowid"):
+            cfg = {k: row[k] for k in row.keys() if k not in ("rowid", "enabled")}
+            yield (cfg.get("site") or "", cfg, f"{os.path.basename(path)}#{row['rowid']}")
+    finally:
+        conn.close()
+
+
+def file_accounts(path: str) -> Iterator[RawAccount]:
+    """依副檔名串流讀取帳號檔（JSONL 或 SQLite）。"""
+    log(f"📂 讀取帳號檔: {path}")
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        return _sqlite_accounts(path)
+    return _jsonl_accounts(path)
+
+
+def env_accounts(site) -> Iterator[RawAccount]:
+    """SECRETS_CONTEXT 與直接環境變數中的 <env_prefix>* 帳號。"""
+    prefix = site.env_prefix
+    sources = []
+
+    # 1) SECRETS_CONTEXT（GitHub Actions secrets 傳入）
+    secrets_context_json = os.environ.get("SECRETS_CONTEXT")
+    if secrets_context_json:
+        try:
+            sources.append(("SECRETS_CONTEXT", json.loads(secrets_context_json).items()))
+        except (json.JSONDecodeError, AttributeError) as e:
+            log(f"❌ SECRETS_CONTEXT 解析失敗: {e}")
+
+    # 2) 直接環境變數
+    sources.append(("環境變數", list(os.environ.items())))
+
+    for source, items in sources:
+        for key, value in items:
+            if not key.startswith(prefix):
+                continue
+            try:
+                cfg = json.loads(value)
+            except (TypeError, json.JSONDecodeError) as e:
+                log(f"❌ {source} {key} 解析失敗: {e}")
+                continue
+            yield (site.name, cfg, f"{source} {key}")
+
+
+def config_json_account(site) -> Iterator[RawAccount]:
+    """站點目錄下的 config.json（單一帳號；範本佔位內容會被忽略）。"""
+    config_path = os.path.join(CRONJOBS_DIR, site.config_dir, "config.json")
+    if not os.path.exists(config_path):
+        return
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    except Exception as e:
+        log(f"❌ 讀取 {site.config_dir}/config.json 失敗: {e}")
+        return
+    is_template = isinstance(cfg, dict) and any(
+        any(word in str(cfg.get(k, "")) for word in site.template_words)
+        for k in REQUIRED_FIELDS
+    )
+    if is_template:
+        log(f"⚠️ {site.config_dir}/config.json 為範本，忽略")
+        return
+    yield (site.name, cfg, f"{site.config_dir}/config.json")
+
+
+def iter_accounts(
+    sites: Iterable,
+    accounts_path: str = "",
+    shard: Optional[Tuple[int, int]] = None,
+) -> Iterator[Tuple[object, dict]]:
+    """依序串流所有來源的帳號，回傳 (site, cfg)；已驗證、去重並套用分片。"""
+    by_name = {site.name: site for site in sites}
+    seen = set()
+    counts = {name: 0 for name in by_name}
+    rejected = duplicates = 0
+
+    def accept(raw: Iterable[RawAccount]) -> Iterator[Tuple[object, dict]]:
+        nonlocal rejected, duplicates
+        for site_name, cfg, source in raw:
+            account = validate(site_name, cfg, source, by_name)
+            if account is None:
+                rejected += 1
+                continue
+            key = (site_name, account["base_url"], account["user_id"])
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            counts[site_name] += 1
+            if in_shard(account, shard):
+                yield by_name[site_name], account
+
+    if accounts_path:
+        yield from accept(file_accounts(accounts_path))
+    for site in by_name.values():
+        log(f"🔍 檢查 {site.env_prefix}* 環境變數…")
+        yield from accept(env_accounts(site))
+    for site in by_name.values():
+        if not counts[site.name]:
+            yield from accept(config_json_account(site))
+
+    summary = "、".join(f"{name} {count}" for name, count in counts.items())
+    shard_note = f"，分片 {shard[0]}/{shard[1]}" if shard else ""
+    log(f"📒 帳號登錄：{summary}（重複 {duplicates}、無效 {rejected}{shard_note}）")
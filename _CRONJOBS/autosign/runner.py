@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""並行簽到引擎與命令列入口。
+
+- 多帳號以執行緒池並行簽到，總並行數 --concurrency / AUTOSIGN_CONCURRENCY（預設 8）。
+- 同一 host 同時最多 --per-host / AUTOSIGN_PER_HOST 個帳號（預設 2），避免觸發站點限流。
+- 每個帳號的嘗試由 RetryScheduler 排程：--attempts / AUTOSIGN_ATTEMPTS 次（預設 3），
+  失敗後指數退避 + jitter；整次執行期限 --deadline / AUTOSIGN_DEADLINE 秒（預設 900）。
+- 同一 host 連續 --breaker / AUTOSIGN_BREAKER_THRESHOLD 次暫時性失敗（預設 3）即打開斷路器，
+  該 host 剩餘帳號回報為「略過」而不是在重試中耗時；FlareSolverr 本身的失敗不計入，以免擋住直連 fallback。
+- 執行前先查每日帳本（ledger.py）：當日已成功的帳號不發任何請求，--force 可忽略帳本；
+  --status 只讀帳本列出當日各帳號狀態，不連線任何站點。
+- 各階段耗時（FlareSolverr 指令、直連 POST、每次嘗試、每個帳號）經 cronkit.metrics 輸出，
+  見 CRON_METRICS_JSONL / CRON_METRICS_PROM。
+- 帳號來源見 registry.py：--accounts / AUTOSIGN_ACCOUNTS 指定 JSONL 或 SQLite 帳號檔，
+  以 (site, base_url, user_id) 去重；--shard i/n / AUTOSIGN_SHARD 讓多個 runner 分攤帳號。
+- 任一帳號失敗或略過則 exit code 為 1；找不到任何帳號亦為 1。
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import chain
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from autosign.common import env_int, host_of, log, log_tag, pop_detail
+from autosign.context import RunContext
+from autosign.ledger import Ledger
+from autosign.registry import iter_accounts, parse_shard
+from autosign.sites import SITES, Site
+from cronkit import metrics
+from cronkit.retry import CircuitBreaker, Deadline, Outcome, RetryScheduler
+from cronkit.transport import default_transport
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PER_HOST = 2
+DEFAULT_ATTEMPTS = 3
+DEFAULT_DEADLINE = 900
+DEFAULT_BREAKER_THRESHOLD = 3
+SUBMIT_AHEAD = 2  # 已提交未完成的帳號上限 = 並行數 × SUBMIT_AHEAD
+
+Account = Tuple[Site, dict]
+
+
+STATUS_MARKS = {Outcome.OK.value: "✅", Outcome.FAIL.value: "❌", Outcome.SKIPPED.value: "⏭️"}
+
+
+def run_account(
+    site: Site,
+    cfg: dict,
+    ctx: RunContext,
+    scheduler: RetryScheduler,
+    host_limits: Dict[str, threading.BoundedSemaphore],
+) -> dict:
+    """在 per-host 限制下執行單一帳號簽到，回傳結果摘要。"""
+    host = host_of(cfg["base_url"])
+    started = monotonic()
+
+    def attempt(index: int, attempts: int) -> Outcome:
+        with metrics.labels(attempt=index), metrics.phase("attempt") as rec:
+            try:
+                outcome = site.attempt(cfg, ctx, index, attempts)
+            except Exception as e:
+                log(f"❌ 簽到流程未預期錯誤: {e}")
+                outcome = Outcome.RETRY
+            rec["outcome"] = outcome.value
+            return outcome
+
+    labels = metrics.labels(job="autosign", site=site.name, host=host, account=str(cfg["user_id"]))
+    with log_tag(f"{site.name}:{host}#{cfg['user_id']}"), labels:
+        with host_limits[host], metrics.phase("account") as rec:
+            if not scheduler.breaker.is_open(host):
+                log(f"🚀 開始簽到: {cfg['base_url']}")
+            pop_detail()
+            outcome = scheduler.run(host, attempt)
+            detail = pop_detail()
+            rec["outcome"] = outcome.value
+    return {
+        "site": site.name,
+        "base_url": cfg["base_url"],
+        "user_id": str(cfg["user_id"]),
+        "status": outcome.value,
+        "success": outcome is Outcome.OK,
+        "elapsed": monotonic() - started,
+        "quota": detail.get("quota"),
+        "message": detail.get("message"),
+    }
+
+
+def ledger_result(site: Site, cfg: dict, row: dict) -> dict:
+    return {
+        "site": site.name,
+        "base_url": cfg["base_url"],
+        "user_id": str(cfg["user_id"]),
+        "status": Outcome.OK.value,
+        "success": True,
+        "elapsed": 0.0,
+        "quota": row.get("quota"),
+        "message": row.get("message"),
+        "ledger": True,
+    }
+
+
+def run_all(
+    accounts: Iterable[Account],
+    ctx: RunContext,
+    scheduler: RetryScheduler,
+    concurrency: int,
+    per_host: int,
+    force: bool = False,
+) -> List[dict]:
+    """以全域並行上限 + per-host 上限並行執行所有帳號，結果依輸入順序回傳。
+
+    accounts 可為 registry.iter_accounts() 的串流：邊讀邊提交，已提交未完成的帳號最多
+    concurrency * SUBMIT_AHEAD 個，不會先把整份帳號表讀進記憶體。
+    帳本中當日已成功的帳號直接沿用紀錄（force 時忽略），其餘執行後寫回帳本。
+    """
+    results: List[Optional[dict]] = []
+    in_flight: Dict[Future, int] = {}
+    host_limits: Dict[str, threading.BoundedSemaphore] = {}
+    from_ledger = 0
+
+    def settle(futures) -> None:
+        for future in futures:
+            r = results[in_flight.pop(future)] = future.result()
+            ctx.ledger.record(
+                ctx.day, r["site"], r["base_url"], r["user_id"], r["status"], r["quota"], r["message"]
+            )
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="checkin") as executor:
+        try:
+            for site, cfg in accounts:
+                row = None if force else ctx.ledger.get(ctx.day, site.name, cfg["base_url"], cfg["user_id"])
+                if row and row["status"] == Outcome.OK.value:
+                    results.append(ledger_result(site, cfg, row))
+                    from_ledger += 1
+                    continue
+                host = host_of(cfg["base_url"])
+                if host not in host_limits:
+                    host_limits[host] = threading.BoundedSemaphore(per_host)
+                in_flight[executor.submit(run_account, site, cfg, ctx, scheduler, host_limits)] = len(results)
+                results.append(None)
+                if len(in_flight) >= concurrency * SUBMIT_AHEAD:
+                    settle(wait(in_flight, return_when=FIRST_COMPLETED).done)
+        finally:
+            # 讀取帳號中途出錯時，已提交的帳號仍照常完成並寫回帳本
+            settle(list(in_flight))
+    if from_ledger:
+        log(f"📒 帳本顯示 {from_ledger} 個帳號今日（{ctx.day}）已簽到，不再請求")
+    return results
+
+
+def report(results: List[dict], elapsed: float) -> int:
+    """印出每個帳號結果與總結，回傳未成功（失敗 + 略過）數。"""
+    log("📋 簽到結果：")
+    for r in results:
+        mark = STATUS_MARKS.get(r["status"], "❔")
+        note = "（帳本）" if r.get("ledger") else f" {r['elapsed']:.1f}s"
+        log(f"{mark} [{r['site']}] {r['base_url']} (user {r['user_id']}){note}")
+    failed = sum(1 for r in results if r["status"] == Outcome.FAIL.value)
+    skipped = sum(1 for r in results if r["status"] == Outcome.SKIPPED.value)
+    log(f"🏁 完成 {len(results)} 個帳號，失敗 {failed}，略過 {skipped}，總耗時 {elapsed:.1f}s")
+    return failed + skipped
+
+
+def parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(prog="autosign", description="New-API 系站點自動簽到")
+    ap.add_argument("--site", action="append", choices=sorted(SITES), help="只執行指定站點（可重複），預設全部")
+    ap.add_argument("--concurrency", type=int, default=env_int("AUTOSIGN_CONCURRENCY", DEFAULT_CONCURRENCY))
+    ap.add_argument("--per-host", type=int, default=env_int("AUTOSIGN_PER_HOST", DEFAULT_PER_HOST))
+    ap.add_argument("--attempts", type=int, default=env_int("AUTOSIGN_ATTEMPTS", DEFAULT_ATTEMPTS))
+    ap.add_argument("--deadline", type=float, default=env_int("AUTOSIGN_DEADLINE", DEFAULT_DEADLINE, minimum=0),
+                    help="整次執行期限（秒），0 為不限")
+    ap.add_argument("--breaker", type=int, default=env_int("AUTOSIGN_BREAKER_THRESHOLD", DEFAULT_BREAKER_THRESHOLD, minimum=0),
+                    help="同一 host 連續幾次暫時性失敗後短路，0 為停用")
+    ap.add_argument("--accounts", default=os.environ.get("AUTOSIGN_ACCOUNTS", ""),
+                    help="帳號檔（.jsonl 或 .sqlite/.db），與環境變數帳號合併")
+    ap.add_argument("--shard", default=os.environ.get("AUTOSIGN_SHARD", ""),
+                    help="只執行第 i 片（i/n，0 <= i < n），依 base_url + user_id 穩定分配")
+    ap.add_argument("--force", action="store_true", help="忽略帳本，當日已簽到的帳號也重新請求")
+    ap.add_argument("--status", action="store_true", help="只列出帳本中當日各帳號狀態，不連線")
+    return ap.parse_args(argv)
+
+
+def show_status(accounts: Iterable[Account], ctx: RunContext) -> int:
+    """列出當日帳本狀態；全部已簽到回傳 0，否則 1。"""
+    ledger = Ledger(ctx.ledger_path)
+    try:
+        total = pending = 0
+        log(f"📒 {ctx.day} 簽到狀態（{ctx.ledger_path}）：")
+        for site, cfg in accounts:
+            total += 1
+            row = ledger.get(ctx.day, site.name, cfg["base_url"], cfg["user_id"])
+            status = row["status"] if row else "pending"
+            if status != Outcome.OK.value:
+                pending += 1
+            mark = STATUS_MARKS.get(status, "⏳")
+            extra = ""
+            if row:
+                quota = f" quota={row['quota']}" if row["quota"] is not None else ""
+                extra = f"{quota} {row['message'] or ''} @ {row['updated_at']}"
+            log(f"{mark} [{site.name}] {cfg['base_url']} (user {cfg['user_id']}) {status}{extra}")
+        log(f"🏁 {total - pending}/{total} 個帳號今日已簽到")
+        return 1 if pending else 0
+    finally:
+        ledger.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    sites = [SITES[name] for name in (args.site or sorted(SITES))]
+
+    try:
+        shard = parse_shard(args.shard)
+    except ValueError as e:
+        log(f"❌ {e}")
+        return 2
+    # 帳號以串流讀取；先取第一筆，確認至少有一個帳號（並及早回報帳號檔錯誤）
+    accounts = iter_accounts(sites, args.accounts, shard)
+    try:
+        first = next(accounts, None)
+    except (OSError, sqlite3.Error) as e:
+        log(f"❌ 讀取帳號檔失敗: {e}")
+        return 1
+    if first is None:
+        log("❌ 未找到任何有效配置")
+        return 1
+    accounts = chain([first], accounts)
+
+    if args.status:
+        try:
+            return show_status(accounts, RunContext.from_env())
+        except (OSError, sqlite3.Error) as e:
+            log(f"❌ 讀取帳號檔失敗: {e}")
+            return 1
+
+    concurrency = max(1, args.concurrency)
+    per_host = max(1, args.per_host)
+    log(f"ℹ️ 並行上限 {concurrency}，每站點上限 {per_host}")
+
+    started = monotonic()
+    scheduler = RetryScheduler(
+        attempts=args.attempts,
+        deadline=Deadline(args.deadline),
+        breaker=CircuitBreaker(args.breaker),
+        log=log,
+    )
+    with metrics.labels(job="autosign"), RunContext.from_env() as ctx:
+        if not ctx.flaresolverr_configured:
+            log("ℹ️ 未提供 FLARESOLVERR_URL，New-API 僅直連模式")
+        try:
+            results = run_all(accounts, ctx, scheduler, concurrency, per_host, force=args.force)
+        except (OSError, sqlite3.Error) as e:
+            log(f"❌ 讀取帳號檔失敗: {e}")
+            return 1
+
+    failed = report(results, monotonic() - started)
+    metrics.recorder().write_prometheus()
+    log(f"ℹ️ {default_transport().summary()}")
+    return 1 if failed else 0
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""站點 adapter。
+
+每個站點定義帳號環境變數前綴、簽到端點與 Cloudflare 處理策略；
+New-API 系（含 Veloera 等 fork）回應格式相同：{"success": bool, "message": str, "data": {"quota": ...}}。
+
+每次嘗試由 attempt() 回傳 cronkit.retry.Outcome，重試次數、退避與斷路器由 runner 的 RetryScheduler 統一處理。
+FlareSolverr 本身的失敗（建立 session、解挑戰或指令出錯）回傳 PROXY_RETRY，不計入站點 host 的斷路器。
+
+新增站點：繼承 Site 或現有站點類別、調整類別屬性，必要時覆寫 attempt()，再以 @register 註冊。
+"""
+
+from typing import Dict, Optional, Type
+
+from requests.cookies import RequestsCookieJar
+
+from autosign.common import (
+    DEFAULT_UA, is_already_signed, is_cloudflare_block, log, origin_of, parse_api_response, record_detail, truncate,
+)
+from autosign.context import RunContext
+from cronkit.metrics import phase
+from cronkit.retry import Outcome
+from cronkit.transport import default_transport
+
+SITES: Dict[str, "Site"] = {}
+
+
+def register(cls: Type["Site"]) -> Type["Site"]:
+    SITES[cls.name] = cls()
+    return cls
+
+
+class Site:
+    """站點 adapter 基底。"""
+
+    name = ""
+    env_prefix = ""            # 帳號環境變數前綴，例如 NEWAPI_AUTOSIGN_
+    config_dir = ""            # config.json 所在的 _CRONJOBS 子目錄
+    template_words = ("目標站點", "請填入")  # config.json 範本佔位字
+    checkin_path = "/api/user/checkin"
+    user_header = "New-Api-User"
+    verify = True              # 直連是否驗證 TLS 憑證；帳號設定的 "verify" 欄位可覆寫
+
+    def verify_tls(self, cfg: dict) -> bool:
+        value = cfg.get("verify", self.verify)
+        if isinstance(value, str):
+            return value.strip().lower() not in ("0", "false", "no", "off")
+        return bool(value)
+
+    def headers(self, cfg: dict, user_agent: str) -> Dict[str, str]:
+        base_url = cfg["base_url"]
+        return {
+            "Authorization": f"Bearer {cfg['access_token']}",
+            self.user_header: str(cfg["user_id"]),
+            "Accept": "application/json, text/plain, */*",
+            "Content-Type": "application/json;charset=UTF-8",
+            "Origin": base_url,
+            "Referer": f"{base_url}/",
+            "User-Agent": user_agent,
+        }
+
+    def interpret(self, http_status: Optional[int], body: str, via: str) -> Outcome:
+        """判讀簽到回應；「已簽到」視為成功，站點明確拒絕為 FAIL，其餘為可重試的 RETRY。"""
+        if http_status != 200:
+            log(f"⚠️ 回應內容: {truncate(body)}")
+            if http_status in (400, 401, 404):
+                return Outcome.FAIL
+            return Outcome.RETRY
+
+        data = parse_api_response(body)
+        if not data:
+            log(f"❌ 回應非 JSON: {truncate(body)}")
+            return Outcome.RETRY
+
+        if data.get("success"):
+            quota = (data.get("data") or {}).get("quota")
+            message = data.get("message") or "簽到成功"
+            record_detail(quota=quota, message=message)
+            log(f"✅ {message}（{via}），quota: {quota}")
+            return Outcome.OK
+
+        msg = data.get("message", "簽到失敗")
+        record_detail(message=msg)
+        if is_already_signed(msg):
+            log(f"ℹ️ {msg}")
+            return Outcome.OK
+
+        log(f"❌ 簽到失敗（{via}）: {msg}")
+        return Outcome.FAIL
+
+    def checkin_direct(self, cfg: dict, user_agent: str = DEFAULT_UA, cookies: Optional[RequestsCookieJar] = None):
+        """直接 POST 簽到，回傳 (HTTP 狀態, body)；請求失敗時狀態為 None。"""
+        checkin_url = f"{cfg['base_url']}{self.checkin_path}"
+        log(f"🌐 直連簽到: {checkin_url}")
+        try:
+            with phase("checkin.post", clearance=cookies is not None) as rec:
+                resp = default_transport().post(
+                    checkin_url, headers=self.headers(cfg, user_agent), cookies=cookies, json={}, timeout=30,
+                    verify=self.verify_tls(cfg),
+                )
+                rec["http_status"] = resp.status_code
+        except Exception as e:
+            log(f"❌ 直連請求失敗: {e}")
+            return None, ""
+        log(f"ℹ️ 直連回應 HTTP {resp.status_code}")
+        if is_cloudflare_block(resp.status_code, resp.text):
+            log("⚠️ 遭 Cloudflare 攔截")
+        return resp.status_code, resp.text
+
+    def attempt(self, cfg: dict, ctx: RunContext, index: int, attempts: int) -> Outcome:
+        """第 index 次（共 attempts 次）簽到嘗試。"""
+        raise NotImplementedError
+
+
+@register
+class NewApiSite(Site):
+    """New-API（優先使用 FlareSolverr，保持瀏覽器指紋一致）
+
+    - 若提供 FLARESOLVERR_URL：全程使用 FlareSolverr session（request.get 取得 clearance + request.post 完成簽到），
+      避免重新開啟非瀏覽器指紋；session 依 origin 共用，同站點帳號只解一次 clearance。
+    - 若 FlareSolverr 失敗：最後一次嘗試改用直連（帶瀏覽器 UA）。
+    - 若未提供 FLARESOLVERR_URL：每次嘗試皆直連。
+    - Turnstile/Recaptcha 官方尚未支援自動解（CAPTCHA_SOLVER 不可用）。
+    """
+
+    name = "newapi"
+    env_prefix = "NEWAPI_AUTOSIGN_"
+    config_dir = "new_api_sign"
+    template_words = ("目標站點", "請填入", "使用者 ID", "api token")
+
+    def checkin_flaresolverr(self, cfg: dict, ctx: RunContext) -> Outcome:
+        """以 origin 共用的 FlareSolverr session（已取得 clearance）POST 簽到。"""
+        base_url = cfg["base_url"]
+        origin = origin_of(base_url)
+        pool = ctx.flaresolverr
+
+        log(f"🧩 FlareSolverr 流程開始: {base_url}")
+        sess = None
+        try:
+            for refreshed in (False, True):
+                sess = pool.acquire(origin)
+                if not sess:
+                    return Outcome.PROXY_RETRY
+
+                # 在同一 session 內執行 POST 簽到
+                payload = {
+                    "cmd": "request.post",
+                    "url": f"{base_url}{self.checkin_path}",
+                    "session": sess.session_id,
+                    "headers": self.headers(cfg, sess.user_agent),
+                    "postData": "{}",  # 保持空 JSON 主體
+                    "maxTimeout": 60000,
+                }
+                with sess.lock:
+                    data = pool.command(payload, timeout=70)
+                if data.get("status") != "ok":
+                    log(f"❌ FlareSolverr post 狀態非 ok: {data}")
+                    pool.invalidate(origin, sess)
+                    return Outcome.PROXY_RETRY
+
+                solution = data.get("solution", {})
+                http_status = solution.get("status")
+                body = solution.get("response", "")
+                log(f"ℹ️ FlareSolverr 簽到回應 HTTP {http_status}")
+
+                if http_status in (403, 503) and not refreshed:
+                    log("🔁 clearance 遭拒，重建 session 後重試")
+                    pool.invalidate(origin, sess)
+                    continue
+                return self.interpret(http_status, body, "FlareSolverr")
+            return Outcome.RETRY
+
+        except Exception as e:
+            log(f"❌ FlareSolverr 流程錯誤: {e}")
+            if sess:
+                pool.invalidate(origin, sess)
+            return Outcome.PROXY_RETRY
+
+    def attempt(self, cfg: dict, ctx: RunContext, index: int, attempts: int) -> Outcome:
+        """依照策略執行簽到：優先 FlareSolverr，最後一次嘗試改直連。"""
+        if ctx.flaresolverr_configured:
+            if index < attempts - 1 or attempts == 1:
+                log(f"🔄 FlareSolverr 嘗試 {index + 1}/{attempts}")
+                return self.checkin_flaresolverr(cfg, ctx)
+            log("🔀 FlareSolverr 失敗，改用直連 fallback")
+        return self.interpret(*self.checkin_direct(cfg), "直連")
+
+
+@register
+class VeloeraSite(Site):
+    """Veloera（FlareSolverr 取得 clearance，然後直接 POST）
+
+    FlareSolverr v2+ 移除了 headers 參數支持，因此：
+    1. 先用 clearance 快取中的 cookies + User-Agent 直接 POST（一次 HTTP 往返）
+    2. 快取不存在、過期或被 Cloudflare 拒絕時，才向 FlareSolverr 取得 clearance 並寫回快取
+    - 未設定 FLARESOLVERR_URL 時使用 http://localhost:8191。
+    - 沿用舊版 veloera_sign 的行為，直連預設不驗證 TLS 憑證（自簽或內網站點）；帳號設定 "verify": true 可開啟。
+    """
+
+    name = "veloera"
+    env_prefix = "VELOERA_AUTOSIGN_"
+    config_dir = "veloera_sign"
+    template_words = ("目標站點", "請填入", "veloera 的使用者 ID", "veloera system api token")
+    checkin_path = "/api/user/check_in"
+    user_header = "Veloera-User"
+    verify = False
+
+    @staticmethod
+    def cookie_jar(clearance: dict) -> RequestsCookieJar:
+        # 逐次傳入 cookies，不寫進共用 session
+        jar = RequestsCookieJar()
+        for cookie in clearance.get("cookies", []):
+            jar.set(
+                cookie.get("name"),
+                cookie.get("value"),
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/"),
+            )
+        return jar
+
+    def post_with_clearance(self, cfg: dict, clearance: dict) -> Optional[Outcome]:
+        """帶 clearance 直接 POST；回傳 None 表示 clearance 被 Cloudflare 拒絕。"""
+        http_status, body = self.checkin_direct(
+            cfg, clearance.get("user_agent") or DEFAULT_UA, self.cookie_jar(clearance)
+        )
+        if is_cloudflare_block(http_status, body):
+            return None
+        return self.interpret(http_status, body, "clearance 直連")
+
+    def attempt(self, cfg: dict, ctx: RunContext, index: int, attempts: int) -> Outcome:
+        origin = origin_of(cfg["base_url"])
+        clearance = ctx.clearance.get(origin)
+        if clearance:
+            log(f"⚡ 使用快取 clearance 直接簽到: {origin}")
+            result = self.post_with_clearance(cfg, clearance)
+            if result is not None:
+                return result
+            ctx.clearance.drop(origin, clearance)
+
+        pool = ctx.flaresolverr
+        try:
+            sess = pool.acquire(origin)
+        except Exception as e:
+            log(f"❌ FlareSolverr 錯誤: {e}")
+            return Outcome.PROXY_RETRY
+        if not sess:
+            return Outcome.PROXY_RETRY
+        clearance = sess.clearance()
+        ctx.clearance.put(origin, clearance)
+        result = self.post_with_clearance(cfg, clearance)
+        if result is None:
+            ctx.clearance.drop(origin, clearance)
+            pool.invalidate(origin, sess)
+            return Outcome.RETRY
+        return result
@@ -0,0 +1 @@
+"""離線替身伺服器與基準測試（不連線任何真實站點）。"""
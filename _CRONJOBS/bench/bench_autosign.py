@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""autosign 離線基準測試：以 standins.py 的替身伺服器驅動完整簽到流程。
+
+    python bench/bench_autosign.py --site newapi --accounts 40 --hosts 4 --runs 5
+    python bench/bench_autosign.py --site veloera --accounts 40 --hosts 4 --runs 5 --cold
+
+每輪以新的 RunContext 跑完所有帳號（忽略帳號帳本），回報每輪總耗時的 p50/p95、
+單帳號耗時的 p50/p95、吞吐量（帳號/秒），以及 FlareSolverr session 建立次數與 HTTP 連線重用情況。
+預設跨輪保留 clearance 快取（模擬每日排程），--cold 則每輪使用全新狀態目錄。
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from time import monotonic
+from typing import List, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from autosign.context import RunContext  # noqa: E402
+from autosign.runner import run_all  # noqa: E402
+from autosign.sites import SITES  # noqa: E402
+from bench.standins import CheckinSiteStandin, FlareSolverrStandin  # noqa: E402
+from cronkit.retry import CircuitBreaker, Deadline, RetryScheduler  # noqa: E402
+from cronkit.transport import default_transport  # noqa: E402
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """nearest-rank 百分位數。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--site", choices=sorted(SITES), default="newapi")
+    ap.add_argument("--accounts", type=int, default=20)
+    ap.add_argument("--hosts", type=int, default=2, help="替身站點數，帳號輪流分配")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--per-host", type=int, default=2)
+    ap.add_argument("--attempts", type=int, default=3)
+    ap.add_argument("--solve-latency", type=float, default=1.0, help="FlareSolverr 挑戰求解秒數")
+    ap.add_argument("--post-latency", type=float, default=0.2, help="FlareSolverr request.post 額外秒數")
+    ap.add_argument("--site-latency", type=float, default=0.05, help="站點回應秒數")
+    ap.add_argument("--failure-rate", type=float, default=0.0, help="FlareSolverr 與站點的注入失敗率")
+    ap.add_argument("--cold", action="store_true", help="每輪使用全新狀態目錄（不沿用 clearance 快取）")
+    ap.add_argument("--verbose", action="store_true", help="保留 autosign 日誌輸出")
+    return ap.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    site = SITES[args.site]
+    require_clearance = args.site == "veloera"
+
+    fs = FlareSolverrStandin(
+        solve_latency=args.solve_latency, post_latency=args.post_latency, failure_rate=args.failure_rate
+    ).start()
+    sites = [
+        CheckinSiteStandin(latency=args.site_latency, failure_rate=args.failure_rate,
+                           require_clearance=require_clearance).start()
+        for _ in range(max(1, args.hosts))
+    ]
+    accounts = [
+        (site, {"base_url": sites[i % len(sites)].url, "user_id": str(1000 + i), "access_token": f"token-{i}"})
+        for i in range(args.accounts)
+    ]
+
+    run_walls: List[float] = []
+    account_times: List[float] = []
+    failures = 0
+    creates_per_run: List[int] = []
+    transport = default_transport()
+    before = transport.stats()
+    shared_state = tempfile.TemporaryDirectory(prefix="autosign-bench-")
+    try:
+        for run in range(args.runs):
+            with contextlib.ExitStack() as stack:
+                state_dir = shared_state.name
+                if args.cold:
+                    state_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="autosign-bench-"))
+                if not args.verbose:
+                    stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                scheduler = RetryScheduler(
+                    attempts=args.attempts, base_delay=0.2, max_delay=2.0,
+                    deadline=Deadline(0), breaker=CircuitBreaker(0),
+                )
+                creates_before = fs.stats["sessions.create"]
+                started = monotonic()
+                with RunContext(flaresolverr_url=fs.url, state_dir=state_dir) as ctx:
+                    results = run_all(accounts, ctx, scheduler, args.concurrency, args.per_host, force=True)
+                wall = monotonic() - started
+            run_walls.append(wall)
+            account_times.extend(r["elapsed"] for r in results)
+            failed = sum(1 for r in results if not r["success"])
+            failures += failed
+            creates_per_run.append(fs.stats["sessions.create"] - creates_before)
+            print(f"run {run + 1}/{args.runs}: {wall:.2f}s, failed {failed}, "
+                  f"FlareSolverr sessions {creates_per_run[-1]}")
+    finally:
+        shared_state.cleanup()
+        fs.stop()
+        for s in sites:
+            s.stop()
+
+    after = transport.stats()
+    total_accounts = args.accounts * args.runs
+    print()
+    print(f"site={args.site} accounts={args.accounts} hosts={len(sites)} runs={args.runs} "
+          f"concurrency={args.concurrency} per_host={args.per_host}")
+    print(f"run wall time      p50 {percentile(run_walls, 50):.2f}s  p95 {percentile(run_walls, 95):.2f}s")
+    print(f"per-account time   p50 {percentile(account_times, 50):.2f}s  p95 {percentile(account_times, 95):.2f}s")
+    print(f"throughput         {total_accounts / sum(run_walls):.2f} accounts/s")
+    print(f"failures           {failures}/{total_accounts}")
+    print(f"FlareSolverr       sessions.create per run {creates_per_run}, request.get total {fs.stats['request.get']}")
+    print(f"HTTP               requests {after['requests'] - before['requests']}, "
+          f"connections opened {after['connections'] - before['connections']}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""論壇回應分類基準測試：cronkit.classify.Classifier（依優先序 `in`）vs 單一正規表示式一趟掃描。
+
+    python bench/bench_classify.py --size 200000 --repeat 200
+
+以 TSDM 簽到 / 打工的片語表產生仿 Discuz 頁面（中英混合的大量 HTML，片語放在頁首、頁尾或不出現），
+先確認兩種做法對每一頁的判定一致，再回報每頁平均耗時（µs）與倍率（>1 表示 Classifier 較快）。
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+from typing import List, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tsdm-autosign"))
+from cronkit.classify import Classifier, ForumOutcome  # noqa: E402
+from SCF_sign import sign_classifier  # noqa: E402
+from SCF_work import work_classifier  # noqa: E402
+
+FILLER = (
+    '<div class="bm_c"><a href="forum.php?mod=viewthread&tid={n}">天使动漫论坛 第{n}帖</a>'
+    '<span class="xg1">2024-12-04 12:{m:02d}</span><em>回复 {n} / 查看 {m}</em></div>\n'
+)
+
+
+def make_page(size: int, phrase: str, where: str, rng: random.Random) -> str:
+    parts = []
+    total = 0
+    while total < size:
+        part = FILLER.format(n=rng.randint(1, 999999), m=rng.randint(0, 59))
+        parts.append(part)
+        total += len(part)
+    body = "".join(parts)
+    if where == "head":
+        return phrase + body
+    if where == "tail":
+        return body + phrase
+    return body
+
+
+class RegexClassifier:
+    """對照組：全部片語編成一個 alternation，一趟 finditer 後依規則順序取最優先者。"""
+
+    def __init__(self, rules: Sequence[Tuple[str, ForumOutcome]]):
+        self.priority = {}
+        for index, (phrase, outcome) in enumerate(rules):
+            self.priority.setdefault(phrase, (index, outcome))
+        phrases = sorted(self.priority, key=len, reverse=True)
+        self.pattern = re.compile("|".join(re.escape(p) for p in phrases))
+
+    def classify(self, text: str) -> ForumOutcome:
+        best = None
+        for match in self.pattern.finditer(text):
+            hit = self.priority[match.group(0)]
+            if best is None or hit[0] < best[0]:
+                best = hit
+                if best[0] == 0:
+                    break
+        return best[1] if best else ForumOutcome.UNKNOWN
+
+
+def bench(name: str, classifier: Classifier, pages: List[Tuple[str, str]], repeat: int) -> None:
+    regex = RegexClassifier(classifier.rules)
+    for label, page in pages:
+        expected = classifier.classify(page)
+        actual = regex.classify(page)
+        if expected is not actual:
+            raise SystemExit("%s %s: 判定不一致 classifier=%s regex=%s" % (name, label, expected, actual))
+        ordered = timeit.timeit(lambda: classifier.classify(page), number=repeat) / repeat
+        single = timeit.timeit(lambda: regex.classify(page), number=repeat) / repeat
+        print("%-6s %-18s %-14s classifier %8.1f µs  regex %8.1f µs  x%.2f" % (
+            name, label, expected.value, ordered * 1e6, single * 1e6, single / ordered if ordered else 0))
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--size", type=int, default=200000, help="每頁字元數")
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    for name, classifier in (("sign", sign_classifier), ("work", work_classifier)):
+        last_phrase = classifier.rules[-1][0]
+        first_phrase = classifier.rules[0][0]
+        pages = [
+            ("no phrase", make_page(args.size, "", "none", rng)),
+            ("first rule @tail", make_page(args.size, first_phrase, "tail", rng)),
+            ("last rule @head", make_page(args.size, last_phrase, "head", rng)),
+            ("last rule @tail", make_page(args.size, last_phrase, "tail", rng)),
+        ]
+        bench(name, classifier, pages, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""離線替身伺服器：FlareSolverr /v1 指令協定與 New-API / Veloera 簽到端點。
+
+兩者皆為背景執行緒中的 ThreadingHTTPServer，port=0 時自動挑選空閒埠。
+
+- FlareSolverrStandin：sessions.create / sessions.destroy / request.get / request.post；
+  request.get 模擬挑戰求解延遲並回傳 cf_clearance cookie 與 userAgent，
+  request.post 以該 session 的 cookie 實際轉送到目標站點；可注入延遲與失敗率。
+- CheckinSiteStandin：POST /api/user/checkin（New-API）與 /api/user/check_in（Veloera）；
+  require_clearance 時沒有有效 cf_clearance 就回 Cloudflare 403 挑戰頁，同一帳號當日第二次簽到回「今日已签到」。
+
+手動測試：python bench/standins.py --fs-port 8191 --site-port 18001
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Set, Tuple
+
+STANDIN_UA = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+CLEARANCE_VALUE = "standin-clearance"
+CHALLENGE_PAGE = "<!DOCTYPE html><title>Just a moment...</title><p>Checking your browser - Cloudflare</p>"
+
+
+class _Server:
+    """背景執行的 ThreadingHTTPServer 外殼。"""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self, port: int = 0, host: str = "127.0.0.1"):
+        owner = self
+
+        class Handler(self.handler_class):
+            standin = owner
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def start(self) -> "_Server":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _send_json(handler: BaseHTTPRequestHandler, status: int, payload: dict) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    handler.send_response(status)
+    handler.send_header("Content-Type", "application/json")
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def _jittered(seconds: float) -> float:
+    return max(0.0, random.uniform(seconds * 0.8, seconds * 1.2)) if seconds else 0.0
+
+
+class _FlareSolverrHandler(BaseHTTPRequestHandler):
+    standin: "FlareSolverrStandin"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            _send_json(self, 400, {"status": "error", "message": "invalid JSON"})
+            return
+        status, payload = self.standin.handle(req)
+        _send_json(self, status, payload)
+
+
+class FlareSolverrStandin(_Server):
+    handler_class = _FlareSolverrHandler
+
+    def __init__(
+        self,
+        port: int = 0,
+        solve_latency: float = 0.0,
+        post_latency: float = 0.0,
+        failure_rate: float = 0.0,
+        clearance_ttl: int = 3600,
+    ):
+        super().__init__(port)
+        self.solve_latency = solve_latency
+        self.post_latency = post_latency
+        self.failure_rate = failure_rate
+        self.clearance_ttl = clearance_ttl
+        self.sessions: Set[str] = set()
+
+    def handle(self, req: dict) -> Tuple[int, dict]:
+        cmd = req.get("cmd", "")
+        self.count(cmd)
+        if cmd == "sessions.create":
+            session_id = str(uuid.uuid4())
+            self.sessions.add(session_id)
+            return 200, {"status": "ok", "message": "Session created successfully.", "session": session_id}
+        if cmd == "sessions.destroy":
+            self.sessions.discard(req.get("session"))
+            return 200, {"status": "ok", "message": "The session has been removed."}
+        if cmd not in ("request.get", "request.post"):
+            return 500, {"status": "error", "message": f"Request parameter 'cmd' = '{cmd}' is invalid."}
+        if req.get("session") and req["session"] not in self.sessions:
+            return 500, {"status": "error", "message": "This session does not exist."}
+
+        if cmd == "request.get":
+            time.sleep(_jittered(self.solve_latency))
+            if random.random() < self.failure_rate:
+                self.count("injected_failure")
+                return 500, {"status": "error", "message": "Error: Error solving the challenge. Timeout after 60.0 seconds."}
+            return 200, {
+                "status": "ok",
+                "message": "Challenge solved!",
+                "solution": {
+                    "url": req.get("url"),
+                    "status": 200,
+                    "cookies": [{
+                        "name": "cf_clearance",
+                        "value": CLEARANCE_VALUE,
+                        "domain": "127.0.0.1",
+                        "path": "/",
+                        "expiry": int(time.time()) + self.clearance_ttl,
+                    }],
+                    "userAgent": STANDIN_UA,
+                    "response": "<html>ok</html>",
+                },
+            }
+
+        time.sleep(_jittered(self.post_latency))
+        if random.random() < self.failure_rate:
+            self.count("injected_failure")
+            return 500, {"status": "error", "message": "Error: Timeout after 60.0 seconds."}
+        headers = dict(req.get("headers") or {})
+        headers["Cookie"] = f"cf_clearance={CLEARANCE_VALUE}"
+        headers["User-Agent"] = STANDIN_UA
+        forward = urllib.request.Request(
+            req["url"], data=(req.get("postData") or "").encode("utf-8"), headers=headers, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(forward, timeout=30) as resp:
+                status, body = resp.status, resp.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read().decode("utf-8")
+        return 200, {"status": "ok", "message": "", "solution": {"url": req["url"], "status": status, "response": body}}
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    standin: "CheckinSiteStandin"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        status, payload = self.standin.handle(self.path, self.headers)
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            _send_json(self, status, payload)
+
+
+class CheckinSiteStandin(_Server):
+    handler_class = _SiteHandler
+    USER_HEADERS = {"/api/user/checkin": "New-Api-User", "/api/user/check_in": "Veloera-User"}
+
+    def __init__(self, port: int = 0, latency: float = 0.0, failure_rate: float = 0.0, require_clearance: bool = False):
+        super().__init__(port)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.require_clearance = require_clearance
+        self.signed: Dict[Tuple[str, str], int] = {}
+        self._signed_lock = threading.Lock()
+
+    def handle(self, path: str, headers) -> Tuple[int, object]:
+        time.sleep(_jittered(self.latency))
+        user_header = self.USER_HEADERS.get(path.split("?")[0])
+        if not user_header:
+            self.count("not_found")
+            return 404, {"success": False, "message": "not found"}
+        if self.require_clearance and f"cf_clearance={CLEARANCE_VALUE}" not in (headers.get("Cookie") or ""):
+            self.count("challenged")
+            return 403, CHALLENGE_PAGE
+        if random.random() < self.failure_rate:
+            self.count("injected_failure")
+            return 503, {"success": False, "message": "upstream unavailable"}
+        if not (headers.get("Authorization") or "").startswith("Bearer "):
+            self.count("unauthorized")
+            return 401, {"success": False, "message": "無權進行此操作，未登錄且未提供 access token"}
+
+        key = (user_header, headers.get(user_header) or "")
+        with self._signed_lock:
+            first = key not in self.signed
+            self.signed[key] = self.signed.get(key, 0) + 1
+        if not first:
+            self.count("already")
+            return 200, {"success": False, "message": "今日已签到"}
+        self.count("checkin")
+        return 200, {"success": True, "message": "签到成功", "data": {"quota": 500000}}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="啟動 FlareSolverr 與簽到站點替身伺服器")
+    ap.add_argument("--fs-port", type=int, default=8191)
+    ap.add_argument("--site-port", type=int, default=18001)
+    ap.add_argument("--solve-latency", type=float, default=2.0)
+    ap.add_argument("--post-latency", type=float, default=0.3)
+    ap.add_argument("--site-latency", type=float, default=0.1)
+    ap.add_argument("--failure-rate", type=float, default=0.0)
+    ap.add_argument("--require-clearance", action="store_true")
+    args = ap.parse_args()
+
+    fs = FlareSolverrStandin(args.fs_port, args.solve_latency, args.post_latency, args.failure_rate).start()
+    site = CheckinSiteStandin(args.site_port, args.site_latency, args.failure_rate, args.require_clearance).start()
+    print(f"FlareSolverr stand-in: {fs.url}/v1")
+    print(f"Check-in site stand-in: {site.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"FlareSolverr stats: {dict(fs.stats)}")
+        print(f"site stats: {dict(site.stats)}")
+        fs.stop()
+        site.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,5 @@
+"""_CRONJOBS 各簽到腳本共用的基礎元件。
+
+腳本以 `sys.path.insert(0, <_CRONJOBS 目錄>)` 後 `from cronkit import ...` 引用，
+因此本套件維持 Python 3.6 相容（tsdm-autosign 仍以 python:3.6 容器執行）。
+"""
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""瀏覽器匯出格式的 cookie 檔（cookies.json）索引存取與回寫。
+
+檔案格式同 EditThisCookie / TSDM-coin-farmer 的匯出：{ 使用者: [ {domain, name, value, ...}, ... ] }，
+同一使用者可以同時有多個網站的 cookie。
+
+CookieStore 只讀檔一次，依 (domain, 使用者) 建索引並快取序列化後的 Cookie header；
+update_from_response() 把回應（含重導向過程）裡的 Set-Cookie 合併回對應帳號，
+save() 僅在內容有變動時以「暫存檔 + os.replace」原子寫回（權限 600），讓 session 續命。
+
+環境變數 CRON_COOKIES_PATH 可覆寫預設路徑（預設為工作目錄下的 cookies.json）。
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_PATH = "cookies.json"
+
+
+def domain_match(domain: str, cookie_domain: str) -> bool:
+    """Set-Cookie 的 domain 是否屬於 cookie 檔中的 domain（以「.」為界比對）。
+
+    相同 host 或其上層網域的 cookie（bbs.saraba1st.com 收到 .saraba1st.com）都算；
+    檔中 domain 以「.」開頭時涵蓋子網域，子網域的 host-only cookie（.tsdm39.com 收到 www.tsdm39.com）也算。
+    """
+    host = domain.lstrip(".")
+    d = cookie_domain.lstrip(".")
+    if host == d or host.endswith("." + d):
+        return True
+    return domain.startswith(".") and d.endswith("." + host)
+
+
+class CookieStore:
+    """以 (domain, user) 索引的 cookie 檔；執行緒安全。"""
+
+    def __init__(self, path: str = ""):
+        self.path = path or os.environ.get("CRON_COOKIES_PATH", "") or DEFAULT_PATH
+        self._lock = threading.RLock()
+        self._data = None  # type: Optional[Dict[str, List[dict]]]
+        self._index = {}  # type: Dict[Tuple[str, str], OrderedDict]
+        self._headers = {}  # type: Dict[Tuple[str, str], str]
+        self._dirty = False
+
+    def _load(self) -> None:
+        if self._data is not None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            print("%s不存在" % self.path)
+            data = {}
+        self._data = data
+        for user, cookies in data.items():
+            for cookie in cookies:
+                bucket = self._index.setdefault((cookie["domain"], user), OrderedDict())
+                bucket[cookie["name"]] = cookie  # 與原始資料共用同一個 dict，更新時一併生效
+
+    def users(self, domain: str) -> List[str]:
+        """有該 domain cookie 的使用者（依檔案順序）。"""
+        with self._lock:
+            self._load()
+            return [user for user in self._data if (domain, user) in self._index]
+
+    def cookies(self, domain: str, user: str) -> List[dict]:
+        with self._lock:
+            self._load()
+            return list(self._index.get((domain, user), {}).values())
+
+    def header(self, domain: str, user: str) -> str:
+        """序列化後的 Cookie header（快取，Set-Cookie 更新後才重算）。"""
+        key = (domain, user)
+        with self._lock:
+            cached = self._headers.get(key)
+            if cached is None:
+                cached = "; ".join(c["name"] + "=" + c["value"] for c in self.cookies(domain, user))
+                self._headers[key] = cached
+            return cached
+
+    def update_from_response(self, domain: str, user: str, response) -> int:
+        """把 requests 回應（含 history）的 Set-Cookie 合併回 (domain, user)；回傳變動數。"""
+        changed = 0
+        with self._lock:
+            self._load()
+            key = (domain, user)
+            bucket = self._index.get(key)
+            if bucket is None:
+                return 0
+            now = time.time()
+            for resp in list(getattr(response, "history", ())) + [response]:
+                for jar_cookie in resp.cookies:
+                    if jar_cookie.domain and not domain_match(domain, jar_cookie.domain):
+                        continue
+                    cookie = bucket.get(jar_cookie.name)
+                    if jar_cookie.expires is not None and jar_cookie.expires <= now:
+                        # 伺服器要求刪除：從索引與原始資料中移除
+                        if cookie is not None:
+                            del bucket[jar_cookie.name]
+                            self._data[user].remove(cookie)
+                            changed += 1
+                        continue
+                    if cookie is None:
+                        cookie = {"domain": domain, "name": jar_cookie.name, "path": jar_cookie.path or "/"}
+                        bucket[jar_cookie.name] = cookie
+                        self._data[user].append(cookie)
+                    elif cookie.get("value") == jar_cookie.value:
+                        continue
+                    cookie["value"] = jar_cookie.value
+                    if jar_cookie.expires is not None:
+                        cookie["expirationDate"] = float(jar_cookie.expires)
+                        cookie["session"] = False
+                    changed += 1
+            if changed:
+                self._headers.pop(key, None)
+                self._dirty = True
+        return changed
+
+    def save(self) -> bool:
+        """有變動時原子寫回；回傳是否寫入。
+
+        目錄不可寫（例如雲函數的唯讀程式碼目錄）時只印出警告，更新仍保留在記憶體中供熱啟動沿用。
+        """
+        with self._lock:
+            if not self._dirty or self._data is None:
+                return False
+            directory = os.path.dirname(os.path.abspath(self.path))
+            try:
+                fd, tmp = tempfile.mkstemp(prefix=".cookies-", suffix=".json", dir=directory)
+            except OSError as e:
+                print("%s無法寫回: %s" % (self.path, e))
+                return False
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, ensure_ascii=False, indent=4)
+                os.chmod(tmp, 0o600)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._dirty = False
+            return True
+
+
+_default = None  # type: Optional[CookieStore]
+_default_lock = threading.Lock()
+
+
+def default_store() -> CookieStore:
+    """行程共用的 CookieStore（首次呼叫時建立，之後不再重讀檔案）。"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = CookieStore()
+        return _default
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""通用 Discuz 簽到引擎：論壇差異寫成 Forum 資料，多論壇多帳號一次並行完成。
+
+每個 Forum 描述一個站點：cookie 所屬 domain、取 formhash 的頁面、簽到請求（URL / 方法 / 表單，
+其中 {formhash} 會被替換）、結果片語表（cronkit.classify 規則）。新增論壇只要多一筆 Forum，不用新腳本。
+
+run_forums() 對 cookies.json 中每個論壇的所有帳號並行簽到：
+- 每個論壇一個 Transport（各自的 keep-alive 連線池，跨熱啟動保留），連線池大小 = 該論壇的並行上限；
+- 同一論壇同時最多 concurrency 個帳號，不同論壇互不影響；
+- formhash 以 cronkit.pagescan 串流取得，讀到即停止下載。
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from cronkit.classify import Classifier, ForumOutcome
+from cronkit.cookies import CookieStore
+from cronkit.pagescan import find_formhash
+
+DEFAULT_UA = "Mozilla/5.0 (Windows NT 10.0; WOW64; Trident/7.0; rv:11.0) like Gecko"
+
+
+class Forum:
+    """一個 Discuz 論壇的簽到設定。"""
+
+    def __init__(
+        self,
+        name: str,
+        cookie_domain: str,
+        formhash_url: str,
+        sign_url: str,
+        rules: Sequence[Tuple[str, ForumOutcome]],
+        sign_method: str = "POST",
+        sign_data: Optional[str] = None,
+        referer: str = "",
+        concurrency: int = 4,
+    ):
+        self.name = name
+        self.cookie_domain = cookie_domain
+        self.formhash_url = formhash_url
+        self.sign_url = sign_url
+        self.sign_method = sign_method
+        self.sign_data = sign_data
+        self.referer = referer
+        self.concurrency = max(1, concurrency)
+        self.classifier = Classifier(rules)
+
+    def headers(self, cookie: str) -> Dict[str, str]:
+        headers = {
+            "accept": "text/html, application/xhtml+xml, image/jxr, */*",
+            "User-Agent": DEFAULT_UA,
+            "cookie": cookie,
+            "connection": "Keep-Alive",
+        }
+        if self.referer:
+            headers["referer"] = self.referer
+        if self.sign_data is not None:
+            headers["content-type"] = "application/x-www-form-urlencoded"
+        return headers
+
+    def sign(self, http, store: CookieStore, user: str) -> Tuple[ForumOutcome, str]:
+        """為一個帳號簽到，回傳 (結果, 回應內容摘要)。"""
+        headers = self.headers(store.header(self.cookie_domain, user))
+
+        page = http.get(self.formhash_url, headers=headers, stream=True)
+        store.update_from_response(self.cookie_domain, user, page)
+        formhash, read = find_formhash(page)
+        if formhash is None:
+            return ForumOutcome.LOGGED_OUT, "讀取 %s 位元組仍未找到 formhash" % read
+
+        data = self.sign_data.format(formhash=formhash) if self.sign_data is not None else None
+        response = http.request(self.sign_method, self.sign_url.format(formhash=formhash), data=data, headers=headers)
+        store.update_from_response(self.cookie_domain, user, response)
+        return self.classifier.classify(response.text), response.text[:200]
+
+
+_transports = {}  # type: Dict[str, object]
+_transports_lock = threading.Lock()
+
+
+def forum_transport(forum: Forum):
+    """每個論壇一個連線池；模組層級保留，熱啟動時沿用。"""
+    from cronkit.transport import Transport  # 延遲匯入 requests
+
+    with _transports_lock:
+        if forum.name not in _transports:
+            _transports[forum.name] = Transport(pool_hosts=2, pool_maxsize=forum.concurrency)
+        return _transports[forum.name]
+
+
+def transports() -> List[object]:
+    """目前已建立的各論壇 Transport（供 cronkit.handler 統計連線數）。"""
+    with _transports_lock:
+        return list(_transports.values())
+
+
+def run_forums(forums: Sequence[Forum], store: CookieStore) -> List[Tuple[Forum, str, ForumOutcome, str]]:
+    """所有論壇 × 帳號一次並行簽到；回傳 [(論壇, 帳號, 結果, 摘要)]，依論壇、帳號順序。"""
+    jobs = [(forum, user) for forum in forums for user in store.users(forum.cookie_domain)]
+    if not jobs:
+        return []
+    limits = {forum.name: threading.BoundedSemaphore(forum.concurrency) for forum in forums}
+
+    def one(job):
+        forum, user = job
+        with limits[forum.name]:
+            try:
+                outcome, detail = forum.sign(forum_transport(forum), store, user)
+            except Exception as e:
+                outcome, detail = ForumOutcome.UNKNOWN, "請求出錯: %s" % e
+        return forum, user, outcome, detail
+
+    with ThreadPoolExecutor(max_workers=sum(forum.concurrency for forum in forums)) as executor:
+        return list(executor.map(one, jobs))
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""雲函數入口：跨熱啟動保留狀態，並回報冷 / 熱啟動耗時。
+
+同一個容器內的多次呼叫會重用已載入的模組，因此放在模組層級的單例
+（cronkit.cookies.default_store 解析好的 cookie、cronkit.transport.default_transport 的 keep-alive 連線池）
+在熱啟動時不需重建。serverless() 把腳本的 run() 包成 main_handler(event, context)，
+印出並回傳這次是冷啟動還是熱啟動、模組載入到首次呼叫的時間、執行時間，以及本次新建的連線數。
+
+本模組刻意不匯入 requests：transport() 延遲到第一次需要連線時才載入 cronkit.transport，
+冷啟動的模組載入階段因此少約 0.1 秒，沒有帳號可跑的呼叫則完全不載入。
+"""
+
+import sys
+import threading
+import time
+
+_loaded_at = time.time()  # 腳本最先匯入本模組，近似於冷啟動開始載入的時間
+_invocations = 0
+_lock = threading.Lock()
+
+
+def transport():
+    """行程共用的 Transport（延遲匯入 requests）。"""
+    from cronkit.transport import default_transport
+
+    return default_transport()
+
+
+def say(tag: str, msg: str) -> None:
+    """印出一行帶 [tag]（帳號）前綴的日誌；整行一次寫出，並行的帳號不會互相插入半行。"""
+    print("[%s] %s\n" % (tag, msg), end="", flush=True)
+
+
+def _connections() -> int:
+    """目前已載入的各 Transport（共用連線池與 cronkit.discuz 的各論壇連線池）累計新建連線數。"""
+    transports = []
+    module = sys.modules.get("cronkit.transport")
+    if module is not None and module._default is not None:
+        transports.append(module._default)
+    discuz = sys.modules.get("cronkit.discuz")
+    if discuz is not None:
+        transports.extend(discuz.transports())
+    return sum(t.stats()["connections"] for t in transports)
+
+
+def serverless(run):
+    """把無參數的 run() 包成雲函數入口 main_handler(event, context)。"""
+
+    def main_handler(event, context):
+        global _invocations
+        with _lock:
+            _invocations += 1
+            invocation = _invocations
+        cold = invocation == 1
+        started = time.time()
+        connections_before = _connections()
+
+        run()
+
+        report = {
+            "cold": cold,
+            "invocation": invocation,
+            "run_seconds": round(time.time() - started, 3),
+            "new_connections": _connections() - connections_before,
+        }
+        if cold:
+            report["init_seconds"] = round(started - _loaded_at, 3)
+            print("冷啟動（第 1 次呼叫）：模組載入 %.3f 秒，執行 %.3f 秒，新建連線 %s 條" % (
+                report["init_seconds"], report["run_seconds"], report["new_connections"]))
+        else:
+            print("熱啟動（第 %s 次呼叫）：執行 %.3f 秒，新建連線 %s 條" % (
+                invocation, report["run_seconds"], report["new_connections"]))
+        return report
+
+    return main_handler
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""分階段計時：每個階段輸出一行 JSON，並可彙總成 Prometheus textfile-collector 檔案。
+
+    with phase("flaresolverr.request.get") as rec:
+        ...
+        rec["http_status"] = 200
+
+每筆紀錄欄位：phase、start/end（epoch 秒）、duration、outcome（ok / error 或呼叫端指定）、
+以及 labels() 設定的執行緒脈絡（job、site、host、account、attempt…）與呼叫端補上的欄位。
+
+環境變數：
+- CRON_METRICS_JSONL：JSON lines 輸出檔（附加寫入；"-" 為 stdout），未設定則不輸出
+- CRON_METRICS_PROM：Prometheus textfile 路徑（例如 /var/lib/node_exporter/textfile/autosign.prom），
+  於 write_prometheus() 時原子覆寫；histogram 以 job/phase/site/host 為 label（不含帳號，控制基數）
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+PROM_LABELS = ("job", "phase", "site", "host")
+
+_context = threading.local()
+
+
+@contextmanager
+def labels(**kw) -> Iterator[None]:
+    """在區塊內為本執行緒之後的 phase 紀錄附加欄位。"""
+    previous = getattr(_context, "labels", {})
+    _context.labels = dict(previous, **kw)
+    try:
+        yield
+    finally:
+        _context.labels = previous
+
+
+def current_labels() -> Dict[str, object]:
+    return dict(getattr(_context, "labels", {}))
+
+
+class PhaseRecorder:
+    def __init__(self, jsonl_path: str = "", prom_path: str = ""):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self._lock = threading.Lock()
+        # (job, phase, site, host) -> [bucket counts..., sum, count]
+        self._histograms: Dict[Tuple[str, ...], List[float]] = {}
+
+    @contextmanager
+    def phase(self, name: str, **fields) -> Iterator[dict]:
+        rec = current_labels()
+        rec.update(fields)
+        rec["phase"] = name
+        start = time.time()
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        except BaseException as e:
+            rec.setdefault("outcome", "error")
+            rec.setdefault("error", type(e).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - t0
+            rec["start"] = round(start, 3)
+            rec["end"] = round(start + elapsed, 3)
+            rec["duration"] = round(elapsed, 4)
+            rec.setdefault("outcome", "ok")
+            self.emit(rec)
+
+    def emit(self, rec: dict) -> None:
+        key = tuple(str(rec.get(k, "")) for k in PROM_LABELS)
+        line = json.dumps(rec, ensure_ascii=False, default=str)
+        with self._lock:
+            hist = self._histograms.setdefault(key, [0.0] * (len(BUCKETS) + 2))
+            for i, le in enumerate(BUCKETS):
+                if rec["duration"] <= le:
+                    hist[i] += 1
+            hist[-2] += rec["duration"]
+            hist[-1] += 1
+            if self.jsonl_path == "-":
+                print(line, file=sys.stdout, flush=True)
+            elif self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+
+    def write_prometheus(self, path: Optional[str] = None) -> None:
+        """把目前累積的 histogram 原子寫成 textfile-collector 格式。"""
+        path = path or self.prom_path
+        if not path:
+            return
+        out = [
+            "# HELP cron_phase_duration_seconds Duration of cron job phases.",
+            "# TYPE cron_phase_duration_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted(self._histograms.items())
+        jobs = set()
+        for key, hist in items:
+            jobs.add(key[0])
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(PROM_LABELS, key))
+            for le, count in zip(BUCKETS, hist):
+                out.append(f'cron_phase_duration_seconds_bucket{{{base},le="{le}"}} {int(count)}')
+            out.append(f'cron_phase_duration_seconds_bucket{{{base},le="+Inf"}} {int(hist[-1])}')
+            out.append(f"cron_phase_duration_seconds_sum{{{base}}} {hist[-2]:.4f}")
+            out.append(f"cron_phase_duration_seconds_count{{{base}}} {int(hist[-1])}")
+        out.append("# HELP cron_last_run_timestamp_seconds Unix time the job last wrote metrics.")
+        out.append("# TYPE cron_last_run_timestamp_seconds gauge")
+        for job in sorted(jobs):
+            out.append(f'cron_last_run_timestamp_seconds{{job="{_escape(job)}"}} {time.time():.0f}')
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(out) + "\n")
+        os.replace(tmp, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_default: Optional[PhaseRecorder] = None
+_default_lock = threading.Lock()
+
+
+def recorder() -> PhaseRecorder:
+    """行程共用的 PhaseRecorder（依環境變數設定）。"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = PhaseRecorder(
+                jsonl_path=os.environ.get("CRON_METRICS_JSONL", "").strip(),
+                prom_path=os.environ.get("CRON_METRICS_PROM", "").strip(),
+            )
+        return _default
+
+
+def phase(name: str, **fields):
+    """recorder().phase 的捷徑。"""
+    return recorder().phase(name, **fields)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""串流掃描 HTTP 回應：找到目標 token 就停止下載。
+
+Discuz 頁面動輒上百 KB，formhash 卻在前幾 KB 的 <head> / 導覽列就出現。
+scan() 以 stream=True 的回應逐塊讀取，跨塊邊界保留重疊區避免漏配，命中後：
+- 剩餘內容（依 Content-Length 估算）不超過 drain_limit 就讀完，連線回到 keep-alive 連線池；
+- 否則直接關閉連線，不再傳輸剩下的頁面。
+"""
+
+import re
+from typing import Optional, Pattern, Tuple
+
+CHUNK_SIZE = 4096
+MAX_BYTES = 1024 * 1024  # 讀到這麼多仍未命中就放棄
+DRAIN_LIMIT = 16 * 1024
+OVERLAP = 256  # 跨塊保留的位元組數，需大於 pattern 可能匹配的最大長度
+
+# Discuz 的 formhash 固定為 8 位小寫十六進位（連結 formhash=xxxx 或隱藏欄位 value="xxxx"）
+FORMHASH_RE = re.compile(rb'formhash(?:=|"\s+value=")([0-9a-f]{8})(?![0-9A-Za-z])')
+
+
+def _release(response, drain_limit: int) -> None:
+    """命中後釋放回應：剩餘量小就讀完以保留連線，否則關閉。"""
+    raw = response.raw
+    length = response.headers.get("Content-Length")
+    remaining = None
+    if length and length.isdigit() and hasattr(raw, "tell"):
+        remaining = int(length) - raw.tell()
+    if remaining is not None and remaining <= drain_limit:
+        for _ in response.iter_content(CHUNK_SIZE):
+            pass
+    response.close()
+
+
+def scan(
+    response,
+    pattern: Pattern = FORMHASH_RE,
+    chunk_size: int = CHUNK_SIZE,
+    max_bytes: int = MAX_BYTES,
+    drain_limit: int = DRAIN_LIMIT,
+) -> Tuple[Optional[bytes], int]:
+    """在串流回應中找 pattern 的第一組 group(1)；回傳 (命中內容或 None, 已讀位元組數)。
+
+    response 必須以 stream=True 取得；呼叫後連線已釋放，不可再讀 .text。
+    """
+    buffer = b""
+    read = 0
+    found = None
+    try:
+        for chunk in response.iter_content(chunk_size):
+            read += len(chunk)
+            buffer = buffer[-OVERLAP:] + chunk
+            match = pattern.search(buffer)
+            if match:
+                found = match.group(1)
+                break
+            if read >= max_bytes:
+                break
+    finally:
+        if found is not None:
+            _release(response, drain_limit)
+        else:
+            response.close()
+    return found, read
+
+
+def find_formhash(response) -> Tuple[Optional[str], int]:
+    """從 Discuz 頁面串流中取出 formhash；回傳 (formhash 或 None, 已讀位元組數)。"""
+    token, read = scan(response)
+    return (token.decode("ascii") if token is not None else None), read
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""重試排程：指數退避 + full jitter、整次執行的 deadline、per-host 斷路器。
+
+每次嘗試回傳 Outcome：
+- OK：成功（含「已簽到」）
+- FAIL：站點有正常回應但拒絕（帳號層級問題，重試無益，也代表 host 正常）
+- RETRY：連線失敗、逾時、5xx、Cloudflare 攔截等 host 層級的暫時性失敗
+- PROXY_RETRY：中介服務（例如 FlareSolverr）本身失敗、根本沒取得站點回應；同樣可重試，
+  但不能據此判斷站點 host 的健康狀態
+排程器回傳的最終結果另有 SKIPPED：host 斷路器已打開或 deadline 已過，根本沒有嘗試。
+
+同一 host 連續 threshold 次 RETRY（期間沒有任何 OK/FAIL）即打開斷路器，
+該 host 其餘帳號不再等待重試、直接回報 SKIPPED；斷路器在本次執行內不會再關閉。
+PROXY_RETRY 既不累加也不歸零計數：FlareSolverr 掛掉時帳號仍能走到直連 fallback。
+"""
+
+import enum
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class Outcome(enum.Enum):
+    OK = "ok"
+    FAIL = "failed"
+    RETRY = "retry"
+    PROXY_RETRY = "proxy_retry"
+    SKIPPED = "skipped"
+
+
+class Deadline:
+    """整次執行的截止時間；seconds 為 0 或負數表示不限。"""
+
+    def __init__(self, seconds: float):
+        self.expires = time.monotonic() + seconds if seconds > 0 else None
+
+    def remaining(self) -> float:
+        if self.expires is None:
+            return float("inf")
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class CircuitBreaker:
+    """per-host 連續暫時性失敗計數；達門檻後該 host 於本次執行內短路。"""
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._open = set()
+
+    def is_open(self, host: str) -> bool:
+        with self._lock:
+            return host in self._open
+
+    def record(self, host: str, outcome: Outcome) -> bool:
+        """記錄一次嘗試結果，回傳斷路器是否因此打開。"""
+        with self._lock:
+            if outcome is Outcome.PROXY_RETRY:
+                return False
+            if outcome is not Outcome.RETRY:
+                self._failures[host] = 0
+                return False
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self.threshold > 0 and self._failures[host] >= self.threshold and host not in self._open:
+                self._open.add(host)
+                return True
+            return False
+
+
+class RetryScheduler:
+    """依退避策略重複呼叫 attempt(index)，直到 OK/FAIL、次數用盡、deadline 或斷路器打開。"""
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 30.0,
+        deadline: Optional[Deadline] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        log: Callable[[str], None] = print,
+    ):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline or Deadline(0)
+        self.breaker = breaker or CircuitBreaker(0)
+        self._sleep = sleep
+        self._log = log
+
+    def backoff(self, index: int) -> float:
+        """第 index 次失敗後的等待秒數：full jitter，上限 max_delay。"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** index)))
+
+    def run(self, host: str, attempt: Callable[[int, int], Outcome]) -> Outcome:
+        """attempt(index, attempts) 回傳單次結果；RETRY 用盡時最終結果為 FAIL。"""
+        if self.breaker.is_open(host):
+            self._log(f"⏭️ {host} 斷路器已打開，略過")
+            return Outcome.SKIPPED
+        if self.deadline.expired():
+            self._log("⏭️ 已超過本次執行期限，略過")
+            return Outcome.SKIPPED
+
+        for index in range(self.attempts):
+            outcome = attempt(index, self.attempts)
+            if self.breaker.record(host, outcome):
+                self._log(f"🔌 {host} 連續 {self.breaker.threshold} 次暫時性失敗，打開斷路器")
+            if outcome not in (Outcome.RETRY, Outcome.PROXY_RETRY):
+                return outcome
+            if index == self.attempts - 1:
+                break
+            if self.breaker.is_open(host):
+                self._log("⏹️ 斷路器已打開，停止重試")
+                break
+            delay = self.backoff(index)
+            if delay >= self.deadline.remaining():
+                self._log("⏹️ 剩餘時間不足以再重試，停止")
+                break
+            self._log(f"🔁 重試 {index + 1}/{self.attempts - 1}，等待 {delay:.1f}s")
+            self._sleep(delay)
+        return Outcome.FAIL
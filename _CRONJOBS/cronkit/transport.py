@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""共用 HTTP 傳輸層：keep-alive 連線池、預設逾時、重試 adapter 與連線重用統計。
+
+module-level 的 requests.get/post 每次都新建 TCP + TLS 連線；改用 Transport 後，
+同一 host 的請求共用 urllib3 連線池，並可用 stats() 比較「開啟連線數 / 送出請求數」。
+
+環境變數（皆可省略）：
+- CRON_HTTP_POOL_HOSTS：快取的 host 連線池數量（預設 16）
+- CRON_HTTP_POOL_MAXSIZE：每個 host 保留的 keep-alive 連線數（預設 10）
+- CRON_HTTP_TIMEOUT：未指定 timeout 時的預設秒數（預設 20）
+- CRON_HTTP_RETRIES：連線失敗 / 502 / 504 的重試次數（預設 2）
+
+Transport 的 session 不保存伺服器回傳的 cookie，避免多帳號共用連線池時互相污染；
+需要帶 cookie 的請求請以 headers 或 cookies= 參數逐次傳入。
+"""
+
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_HOSTS = 16
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_TIMEOUT = 20
+DEFAULT_RETRIES = 2
+RETRY_STATUSES = (502, 504)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.environ.get(name, "").strip()))
+    except ValueError:
+        return default
+
+
+class _Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def incr(self) -> None:
+        with self._lock:
+            self.value += 1
+
+
+def _counting_pool(base, counter: _Counter):
+    """產生會在每次建立 TCP 連線時計數的 urllib3 連線池類別。
+
+    計數放在連線物件的 connect()：提早關閉的回應會把已關閉的連線物件放回池中，
+    下次取用時由 connect() 重新連線而不經過 _new_conn()，只算 _new_conn() 會低估實際連線數。
+    """
+
+    class CountingConnection(base.ConnectionCls):
+        def connect(self):
+            super().connect()
+            counter.incr()
+
+    class CountingPool(base):
+        ConnectionCls = CountingConnection
+
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, counter: _Counter, **kwargs):
+        self._counter = counter
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self._counter),
+            "https": _counting_pool(HTTPSConnectionPool, self._counter),
+        }
+
+
+class Transport:
+    """以單一 requests.Session 承載、各 host 各自一組 keep-alive 連線池的 HTTP 客戶端。"""
+
+    def __init__(
+        self,
+        pool_hosts: int = DEFAULT_POOL_HOSTS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+    ):
+        self.timeout = timeout
+        self._connections = _Counter()
+        self._requests = _Counter()
+
+        # 只重試冪等方法（urllib3 預設）；連線建立失敗則任何方法皆可安全重試
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=0.5,
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False,
+        )
+        adapter = _CountingAdapter(
+            self._connections,
+            pool_connections=pool_hosts,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        self._requests.incr()
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self._requests.value, "connections": self._connections.value}
+
+    def summary(self) -> str:
+        s = self.stats()
+        return f"HTTP 請求 {s['requests']} 次，新建連線 {s['connections']} 條"
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default: Optional[Transport] = None
+_default_lock = threading.Lock()
+
+
+def default_transport() -> Transport:
+    """行程共用的 Transport（依環境變數設定，首次呼叫時建立）。"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Transport(
+                pool_hosts=_env_int("CRON_HTTP_POOL_HOSTS", DEFAULT_POOL_HOSTS) or DEFAULT_POOL_HOSTS,
+                pool_maxsize=_env_int("CRON_HTTP_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE) or DEFAULT_POOL_MAXSIZE,
+                timeout=_env_int("CRON_HTTP_TIMEOUT", DEFAULT_TIMEOUT) or DEFAULT_TIMEOUT,
+                retries=_env_int("CRON_HTTP_RETRIES", DEFAULT_RETRIES),
+            )
+        return _default
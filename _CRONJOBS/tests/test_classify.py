@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""cronkit.classify 規則表，以及 TSDM 簽到 / 打工實際使用的片語。"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tsdm-autosign"))
+from cronkit.classify import Classifier, ForumOutcome  # noqa: E402
+from SCF_sign import sign_classifier  # noqa: E402
+from SCF_work import work_classifier  # noqa: E402
+
+
+class ClassifierTest(unittest.TestCase):
+    def test_first_listed_rule_wins(self):
+        classifier = Classifier([("成功", ForumOutcome.SUCCESS), ("已經", ForumOutcome.ALREADY_DONE)])
+        self.assertIs(classifier.classify("已經...成功"), ForumOutcome.SUCCESS)
+        self.assertIs(classifier.classify("已經完成"), ForumOutcome.ALREADY_DONE)
+
+    def test_no_match_is_unknown(self):
+        self.assertIs(Classifier([("成功", ForumOutcome.SUCCESS)]).classify(""), ForumOutcome.UNKNOWN)
+
+
+class TsdmRulesTest(unittest.TestCase):
+    def test_sign_responses(self):
+        cases = {
+            "<div>恭喜你签到成功!获得随机奖励 天使币 10</div>": ForumOutcome.SUCCESS,
+            "您今日已经签到，请明天再来": ForumOutcome.ALREADY_DONE,
+            "已经过了签到时间段": ForumOutcome.OUT_OF_WINDOW,
+            "签到时间还没有到": ForumOutcome.OUT_OF_WINDOW,
+            "未定义操作，请返回": ForumOutcome.INVALID_REQUEST,
+            "您需要先登录才能继续本操作": ForumOutcome.LOGGED_OUT,
+            "<html>维护中</html>": ForumOutcome.UNKNOWN,
+        }
+        for text, outcome in cases.items():
+            self.assertIs(sign_classifier.classify(text), outcome, text)
+
+    def test_work_responses(self):
+        cases = {
+            "您已经成功领取了奖励天使币": ForumOutcome.SUCCESS,
+            "必须与上一次间隔6小时0分0秒才可再次进行": ForumOutcome.ALREADY_DONE,
+            "作弊行为": ForumOutcome.CHEAT_FLAG,
+            "请先登录再进行点击任务": ForumOutcome.LOGGED_OUT,
+            "服务器负荷较重，操作超时": ForumOutcome.OVERLOADED,
+        }
+        for text, outcome in cases.items():
+            self.assertIs(work_classifier.classify(text), outcome, text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""cronkit.cookies：Set-Cookie 寫回時的 domain 比對。"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from requests.cookies import RequestsCookieJar
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cronkit.cookies import CookieStore, domain_match  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, *cookies):
+        self.history = []
+        self.cookies = RequestsCookieJar()
+        for name, value, domain in cookies:
+            self.cookies.set(name, value, domain=domain, path="/")
+
+
+class DomainMatchTest(unittest.TestCase):
+    def test_parent_domain_cookie(self):
+        self.assertTrue(domain_match("bbs.saraba1st.com", ".saraba1st.com"))
+        self.assertTrue(domain_match("bbs.saraba1st.com", "bbs.saraba1st.com"))
+
+    def test_subdomain_cookie_for_dotted_entry(self):
+        self.assertTrue(domain_match(".tsdm39.com", "www.tsdm39.com"))
+        self.assertTrue(domain_match(".tsdm39.com", ".tsdm39.com"))
+        self.assertFalse(domain_match("bbs.saraba1st.com", "www.bbs.saraba1st.com"))
+
+    def test_requires_dot_boundary(self):
+        self.assertFalse(domain_match("example.com", "evil-example.com"))
+        self.assertFalse(domain_match(".example.com", "evil-example.com"))
+        self.assertFalse(domain_match("evil-example.com", "example.com"))
+
+
+class UpdateFromResponseTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"alice": [{"domain": "bbs.saraba1st.com", "name": "sid", "value": "old", "path": "/"}]}, f)
+        self.addCleanup(os.unlink, self.path)
+
+    def test_parent_domain_set_cookie_is_written_back(self):
+        store = CookieStore(self.path)
+        response = FakeResponse(("sid", "new", ".saraba1st.com"), ("track", "x", "evil-saraba1st.com"))
+        self.assertEqual(store.update_from_response("bbs.saraba1st.com", "alice", response), 1)
+        self.assertEqual(store.header("bbs.saraba1st.com", "alice"), "sid=new")
+        self.assertTrue(store.save())
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["alice"][0]["value"], "new")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""autosign.ledger 每日帳本，以及 runner 依帳本略過當日已簽到帳號。"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from autosign.context import RunContext  # noqa: E402
+from autosign import ledger  # noqa: E402
+from autosign.ledger import Ledger  # noqa: E402
+from autosign.runner import run_all  # noqa: E402
+from autosign.sites import Site  # noqa: E402
+from cronkit.retry import CircuitBreaker, Deadline, Outcome, RetryScheduler  # noqa: E402
+
+DAY = "2026-01-01"
+URL = "http://site.test"
+
+
+class LedgerTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "state", "ledger.sqlite3")
+        self.ledger = Ledger(self.path)
+        self.addCleanup(self.ledger.close)
+
+    def test_record_and_get(self):
+        self.assertIsNone(self.ledger.get(DAY, "newapi", URL, "1"))
+        self.ledger.record(DAY, "newapi", URL, 1, "failed", message="boom")
+        row = self.ledger.get(DAY, "newapi", URL, "1")
+        self.assertEqual((row["status"], row["message"], row["quota"]), ("failed", "boom", None))
+
+    def test_success_is_not_overwritten_by_a_later_failure(self):
+        self.ledger.record(DAY, "newapi", URL, "1", "ok", quota=500, message="簽到成功")
+        self.ledger.record(DAY, "newapi", URL, "1", "failed", message="boom")
+        row = self.ledger.get(DAY, "newapi", URL, "1")
+        self.assertEqual((row["status"], row["quota"], row["message"]), ("ok", "500", "簽到成功"))
+
+    def test_days_and_sites_are_separate(self):
+        self.ledger.record(DAY, "newapi", URL, "1", "ok")
+        self.assertIsNone(self.ledger.get("2026-01-02", "newapi", URL, "1"))
+        self.assertIsNone(self.ledger.get(DAY, "veloera", URL, "1"))
+
+    def test_persists_across_connections(self):
+        self.ledger.record(DAY, "newapi", URL, "1", "ok", quota=1)
+        self.ledger.close()
+        self.ledger = Ledger(self.path)
+        self.assertEqual(self.ledger.get(DAY, "newapi", URL, "1")["status"], "ok")
+
+
+@unittest.skipIf(ledger.ZoneInfo is None, "需要 zoneinfo（Python 3.9+）")
+class TodayTest(unittest.TestCase):
+    def test_missing_tz_data_falls_back_to_local_time(self):
+        with mock.patch.object(ledger, "ZoneInfo", side_effect=ledger.ZoneInfoNotFoundError("Asia/Taipei")):
+            self.assertEqual(ledger.today(), datetime.now().strftime("%Y-%m-%d"))
+
+    def test_malformed_tz_name_falls_back_to_local_time(self):
+        self.assertEqual(ledger.today("../etc"), datetime.now().strftime("%Y-%m-%d"))
+
+
+class CountingSite(Site):
+    name = "counting"
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = 0
+
+    def attempt(self, cfg, ctx, index, attempts):
+        self.calls += 1
+        return self.outcome
+
+
+class RunnerLedgerTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state_dir = tmp.name
+        self.accounts = [{"base_url": URL, "user_id": str(i)} for i in range(3)]
+
+    def run_site(self, site, force=False):
+        scheduler = RetryScheduler(attempts=1, deadline=Deadline(0), breaker=CircuitBreaker(0), log=lambda _: None)
+        with contextlib.redirect_stdout(io.StringIO()), RunContext(state_dir=self.state_dir) as ctx:
+            return run_all([(site, cfg) for cfg in self.accounts], ctx, scheduler, 2, 2, force=force)
+
+    def test_signed_accounts_are_not_requested_again(self):
+        first = CountingSite(Outcome.OK)
+        self.run_site(first)
+        self.assertEqual(first.calls, 3)
+
+        rerun = CountingSite(Outcome.OK)
+        results = self.run_site(rerun)
+        self.assertEqual(rerun.calls, 0)
+        self.assertTrue(all(r["success"] and r["ledger"] for r in results))
+
+        forced = CountingSite(Outcome.OK)
+        self.run_site(forced, force=True)
+        self.assertEqual(forced.calls, 3)
+
+    def test_failed_accounts_are_retried_on_rerun(self):
+        self.run_site(CountingSite(Outcome.FAIL))
+        rerun = CountingSite(Outcome.OK)
+        results = self.run_site(rerun)
+        self.assertEqual(rerun.calls, 3)
+        self.assertEqual([r["status"] for r in results], [Outcome.OK.value] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""cronkit.pagescan：串流找 formhash、跨塊比對與命中後的連線釋放。"""
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cronkit.pagescan import find_formhash, scan  # noqa: E402
+
+
+class FakeRaw:
+    def __init__(self):
+        self.position = 0
+
+    def tell(self):
+        return self.position
+
+
+class FakeResponse:
+    """以 bytes 模擬 stream=True 的 requests 回應，記錄讀取量與是否關閉。"""
+
+    def __init__(self, body: bytes, content_length=True):
+        self.body = body
+        self.raw = FakeRaw()
+        self.headers = {"Content-Length": str(len(body))} if content_length else {}
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        while self.raw.position < len(self.body):
+            chunk = self.body[self.raw.position:self.raw.position + chunk_size]
+            self.raw.position += len(chunk)
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def page(prefix_size, token=b'<input type="hidden" name="formhash" value="1a2b3c4d" />', suffix_size=0):
+    return b"a" * prefix_size + token + b"z" * suffix_size
+
+
+class ScanTest(unittest.TestCase):
+    def test_stops_reading_a_large_page_at_the_token(self):
+        response = FakeResponse(page(3000, suffix_size=300 * 1024))
+        self.assertEqual(find_formhash(response), ("1a2b3c4d", 4096))
+        self.assertTrue(response.closed)
+        self.assertEqual(response.raw.position, 4096)
+
+    def test_drains_a_small_remainder_to_keep_the_connection(self):
+        response = FakeResponse(page(3000, suffix_size=8 * 1024))
+        self.assertEqual(find_formhash(response)[0], "1a2b3c4d")
+        self.assertEqual(response.raw.position, len(response.body))
+        self.assertTrue(response.closed)
+
+    def test_without_content_length_it_closes_instead_of_draining(self):
+        response = FakeResponse(page(3000, suffix_size=8 * 1024), content_length=False)
+        self.assertEqual(find_formhash(response)[0], "1a2b3c4d")
+        self.assertLess(response.raw.position, len(response.body))
+
+    def test_token_split_across_chunks(self):
+        token = b"formhash=deadbeef&"
+        body = page(4096 - 12, token=token, suffix_size=100)
+        self.assertEqual(find_formhash(FakeResponse(body))[0], "deadbeef")
+
+    def test_rejects_tokens_without_the_formhash_shape(self):
+        for token in (b"formhash=DEADBEEF", b"formhash=deadbeef0", b"formhash=12345"):
+            response = FakeResponse(page(10, token=token))
+            self.assertEqual(find_formhash(response), (None, len(response.body)))
+            self.assertTrue(response.closed)
+
+    def test_gives_up_after_max_bytes(self):
+        response = FakeResponse(page(64 * 1024))
+        self.assertEqual(scan(response, max_bytes=16 * 1024), (None, 16 * 1024))
+        self.assertTrue(response.closed)
+
+    def test_custom_pattern(self):
+        response = FakeResponse(b"x" * 5000 + b"action=logout")
+        self.assertEqual(scan(response, re.compile(rb"action=(logout|login)\b")), (b"logout", 5013))
+
+
+if __name__ == "__main__":
+    unittest.main()
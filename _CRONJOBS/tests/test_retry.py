@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""cronkit.retry 的退避、deadline 與斷路器，以及 runner 依此排程帳號的行為。
+
+    cd _CRONJOBS && python -m unittest discover -s tests -t .
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from autosign.context import RunContext  # noqa: E402
+from autosign.runner import SUBMIT_AHEAD, run_all  # noqa: E402
+from autosign.sites import SITES, Site  # noqa: E402
+from bench.standins import CheckinSiteStandin, FlareSolverrStandin  # noqa: E402
+from cronkit.retry import CircuitBreaker, Deadline, Outcome, RetryScheduler  # noqa: E402
+
+
+def scheduler(attempts=3, deadline=None, breaker=None, sleeps=None):
+    return RetryScheduler(
+        attempts=attempts, base_delay=1.0, max_delay=4.0, deadline=deadline or Deadline(0),
+        breaker=breaker or CircuitBreaker(0), sleep=(sleeps.append if sleeps is not None else lambda _: None),
+        log=lambda _: None,
+    )
+
+
+def scripted(*outcomes):
+    """依序回傳 outcomes 的 attempt(index, attempts)，並記錄被呼叫的 index。"""
+    calls = []
+
+    def attempt(index, attempts):
+        calls.append(index)
+        return outcomes[min(index, len(outcomes) - 1)]
+
+    return attempt, calls
+
+
+class RetrySchedulerTest(unittest.TestCase):
+    def test_retries_until_ok_with_bounded_backoff(self):
+        sleeps = []
+        attempt, calls = scripted(Outcome.RETRY, Outcome.RETRY, Outcome.OK)
+        self.assertIs(scheduler(sleeps=sleeps).run("a", attempt), Outcome.OK)
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertEqual(len(sleeps), 2)
+        self.assertTrue(0 <= sleeps[0] <= 1.0 and 0 <= sleeps[1] <= 2.0)
+
+    def test_exhausted_retries_fail(self):
+        attempt, calls = scripted(Outcome.RETRY)
+        self.assertIs(scheduler(attempts=2).run("a", attempt), Outcome.FAIL)
+        self.assertEqual(calls, [0, 1])
+
+    def test_site_rejection_is_not_retried(self):
+        attempt, calls = scripted(Outcome.FAIL)
+        self.assertIs(scheduler().run("a", attempt), Outcome.FAIL)
+        self.assertEqual(calls, [0])
+
+    def test_expired_deadline_skips_without_attempting(self):
+        deadline = Deadline(60)
+        deadline.expires = time.monotonic() - 1
+        attempt, calls = scripted(Outcome.OK)
+        self.assertIs(scheduler(deadline=deadline).run("a", attempt), Outcome.SKIPPED)
+        self.assertEqual(calls, [])
+
+    def test_stops_when_backoff_would_pass_the_deadline(self):
+        sleeps = []
+        deadline = Deadline(60)
+        deadline.expires = time.monotonic() + 0.5
+        s = scheduler(deadline=deadline, sleeps=sleeps)
+        s.backoff = lambda index: 5.0
+        attempt, calls = scripted(Outcome.RETRY)
+        self.assertIs(s.run("a", attempt), Outcome.FAIL)
+        self.assertEqual((calls, sleeps), ([0], []))
+
+    def test_breaker_opens_after_consecutive_retries_and_skips_host(self):
+        breaker = CircuitBreaker(3)
+        attempt, calls = scripted(Outcome.RETRY)
+        self.assertIs(scheduler(attempts=5, breaker=breaker).run("a", attempt), Outcome.FAIL)
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertTrue(breaker.is_open("a"))
+        self.assertIs(scheduler(breaker=breaker).run("a", scripted(Outcome.OK)[0]), Outcome.SKIPPED)
+        self.assertIs(scheduler(breaker=breaker).run("b", scripted(Outcome.OK)[0]), Outcome.OK)
+
+    def test_success_resets_the_breaker_count(self):
+        breaker = CircuitBreaker(2)
+        breaker.record("a", Outcome.RETRY)
+        breaker.record("a", Outcome.OK)
+        self.assertFalse(breaker.record("a", Outcome.RETRY))
+        self.assertTrue(breaker.record("a", Outcome.RETRY))
+
+    def test_proxy_retry_neither_counts_nor_resets(self):
+        breaker = CircuitBreaker(2)
+        for _ in range(5):
+            self.assertFalse(breaker.record("a", Outcome.PROXY_RETRY))
+        self.assertFalse(breaker.is_open("a"))
+        breaker.record("a", Outcome.RETRY)
+        breaker.record("a", Outcome.PROXY_RETRY)
+        self.assertTrue(breaker.record("a", Outcome.RETRY))
+
+    def test_proxy_retry_is_retried(self):
+        attempt, calls = scripted(Outcome.PROXY_RETRY, Outcome.OK)
+        self.assertIs(scheduler(breaker=CircuitBreaker(1)).run("a", attempt), Outcome.OK)
+        self.assertEqual(calls, [0, 1])
+
+
+class ScriptedSite(Site):
+    """每個帳號依 cfg["script"] 依序回傳結果的替身站點，不發任何請求。"""
+
+    name = "scripted"
+
+    def attempt(self, cfg, ctx, index, attempts):
+        script = cfg["script"]
+        return script[min(index, len(script) - 1)]
+
+
+class RunnerBreakerTest(unittest.TestCase):
+    def run_accounts(self, accounts, **kwargs):
+        site = ScriptedSite()
+        with tempfile.TemporaryDirectory() as state_dir, contextlib.redirect_stdout(io.StringIO()):
+            with RunContext(state_dir=state_dir) as ctx:
+                return run_all([(site, cfg) for cfg in accounts], ctx, **kwargs)
+
+    def test_open_breaker_skips_remaining_accounts_on_that_host_only(self):
+        down = [{"base_url": "http://down.test", "user_id": str(i), "script": [Outcome.RETRY]} for i in range(5)]
+        up = [{"base_url": "http://up.test", "user_id": "9", "script": [Outcome.OK]}]
+        results = self.run_accounts(
+            down + up, scheduler=scheduler(attempts=2, breaker=CircuitBreaker(3)), concurrency=1, per_host=1
+        )
+        self.assertEqual(
+            [r["status"] for r in results],
+            [Outcome.FAIL.value, Outcome.FAIL.value] + [Outcome.SKIPPED.value] * 3 + [Outcome.OK.value],
+        )
+
+    def test_expired_deadline_skips_every_account(self):
+        deadline = Deadline(60)
+        deadline.expires = time.monotonic() - 1
+        accounts = [{"base_url": "http://up.test", "user_id": str(i), "script": [Outcome.OK]} for i in range(3)]
+        results = self.run_accounts(accounts, scheduler=scheduler(deadline=deadline), concurrency=2, per_host=2)
+        self.assertEqual([r["status"] for r in results], [Outcome.SKIPPED.value] * 3)
+
+
+class RunnerStreamingTest(unittest.TestCase):
+    """run_all 邊讀邊提交帳號，不先把整個 iterator 讀完。"""
+
+    def test_reads_accounts_lazily_with_a_bounded_window(self):
+        pulled = []
+        seen_while_first_runs = []
+
+        class SlowFirstSite(ScriptedSite):
+            def attempt(self, cfg, ctx, index, attempts):
+                if cfg["user_id"] == "0":
+                    time.sleep(0.2)
+                    seen_while_first_runs.append(len(pulled))
+                return Outcome.OK
+
+        site = SlowFirstSite()
+
+        def accounts():
+            for i in range(10):
+                pulled.append(i)
+                yield site, {"base_url": "http://up.test", "user_id": str(i)}
+
+        with tempfile.TemporaryDirectory() as state_dir, contextlib.redirect_stdout(io.StringIO()):
+            with RunContext(state_dir=state_dir) as ctx:
+                results = run_all(accounts(), ctx, scheduler(), concurrency=1, per_host=1)
+
+        self.assertEqual(seen_while_first_runs, [SUBMIT_AHEAD])
+        self.assertEqual([r["user_id"] for r in results], [str(i) for i in range(10)])
+        self.assertEqual({r["status"] for r in results}, {Outcome.OK.value})
+
+
+
+class FlareSolverrDownTest(unittest.TestCase):
+    """FlareSolverr 全部失敗、站點正常：所有帳號都應經直連 fallback 簽到成功。"""
+
+    ACCOUNTS = 6
+
+    def test_direct_fallback_signs_every_account(self):
+        fs = FlareSolverrStandin(failure_rate=1.0).start()
+        site = CheckinSiteStandin().start()
+        self.addCleanup(fs.stop)
+        self.addCleanup(site.stop)
+        accounts = [
+            (SITES["newapi"], {"base_url": site.url, "user_id": str(1000 + i), "access_token": f"token-{i}"})
+            for i in range(self.ACCOUNTS)
+        ]
+        scheduler = RetryScheduler(
+            attempts=3, deadline=Deadline(0), breaker=CircuitBreaker(3), sleep=lambda _: None, log=lambda _: None
+        )
+        with tempfile.TemporaryDirectory() as state_dir, contextlib.redirect_stdout(io.StringIO()):
+            with RunContext(flaresolverr_url=fs.url, state_dir=state_dir) as ctx:
+                results = run_all(accounts, ctx, scheduler, concurrency=8, per_host=2, force=True)
+
+        self.assertEqual([r["status"] for r in results], [Outcome.OK.value] * self.ACCOUNTS)
+        self.assertEqual(site.stats["checkin"], self.ACCOUNTS)
+        self.assertGreater(fs.stats["injected_failure"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
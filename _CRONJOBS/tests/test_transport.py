@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""cronkit.transport：keep-alive 連線重用、重試與 cookie 隔離。
+
+    cd _CRONJOBS && python -m unittest discover -s tests -t .
+"""
+
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cronkit.transport import Transport  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            hit = server.hits[self.path]
+        status = 502 if self.path == "/flaky" and hit == 1 else 200
+        body = (b"x" * server.body_size) if self.path == "/big" else b"ok"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/cookie":
+            self.send_header("Set-Cookie", "sid=secret; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class KeepAliveServer(ThreadingHTTPServer):
+    """記錄實際 accept 的 TCP 連線數的 HTTP/1.1 keep-alive 伺服器。"""
+
+    daemon_threads = True
+
+    def __init__(self, body_size=0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.accepted = 0
+        self.hits = {}
+        self.body_size = body_size
+
+    def get_request(self):
+        request = super().get_request()
+        with self.lock:
+            self.accepted += 1
+        return request
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%s" % self.server_address[1]
+
+
+class TransportTest(unittest.TestCase):
+    def setUp(self):
+        self.server = KeepAliveServer(body_size=256 * 1024)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.transport = Transport(retries=2)
+        self.addCleanup(self.transport.close)
+
+    def test_sequential_requests_reuse_one_connection(self):
+        for _ in range(5):
+            self.assertEqual(self.transport.get(self.server.url + "/").text, "ok")
+        self.assertEqual(self.transport.stats(), {"requests": 5, "connections": 1})
+        self.assertEqual(self.server.accepted, 1)
+
+    def test_counts_reconnects_after_a_stream_is_closed_early(self):
+        for _ in range(5):
+            response = self.transport.get(self.server.url + "/big", stream=True)
+            next(response.iter_content(4096))
+            response.close()
+        self.assertEqual(self.server.accepted, 5)
+        self.assertEqual(self.transport.stats(), {"requests": 5, "connections": 5})
+
+    def test_drained_stream_keeps_the_connection(self):
+        for _ in range(3):
+            response = self.transport.get(self.server.url + "/big", stream=True)
+            for _ in response.iter_content(64 * 1024):
+                pass
+            response.close()
+        self.assertEqual(self.server.accepted, 1)
+        self.assertEqual(self.transport.stats()["connections"], 1)
+
+    def test_retries_bad_gateway(self):
+        response = self.transport.get(self.server.url + "/flaky")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits["/flaky"], 2)
+        self.assertEqual(self.transport.stats()["requests"], 1)
+
+    def test_session_does_not_keep_server_cookies(self):
+        response = self.transport.get(self.server.url + "/cookie")
+        self.assertEqual(response.cookies.get("sid"), "secret")
+        self.assertEqual(len(self.transport.session.cookies), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""
+TSDM-coin-farmer
+适配云函数, 单个文件入口完成天使动漫多人 签到 + 打工
+每个账户依次: 签到 (SCF_sign.sign_single_post_v2, 即 cronkit.discuz 引擎的天使动漫 Forum) -> 打工 (SCF_work.work_single_async),
+两步共用同一个 keep-alive 连接池与 cookie 存储, 一次冷启动完成原本 SCF_sign.py + SCF_work.py 两次的工作.
+多账户仍按 SCF_work.py 的方式交错进行 (TSDM_WORK_CONCURRENCY 控制同时进行的账户数, 默认 8)
+开始前先并发检查 cookie 是否有效 (SCF_work.filter_live_users), 失效账户直接跳过并列出
+"""
+
+import functools, os, sys, time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cronkit.handler import say, serverless, transport  # 不导入 requests, 第一次发请求时才加载
+from cronkit.classify import ForumOutcome
+from cronkit.cookies import default_store
+
+from SCF_sign import sign_single_post_v2, tsdm_domain
+from SCF_work import filter_live_users, run_work, work_single_async
+
+OUTCOME_TEXT = {
+    ForumOutcome.SUCCESS: "成功",
+    ForumOutcome.ALREADY_DONE: "今日已完成",
+    ForumOutcome.OUT_OF_WINDOW: "不在时间段",
+    ForumOutcome.CHEAT_FLAG: "作弊判定",
+    ForumOutcome.LOGGED_OUT: "cookie失效",
+    ForumOutcome.OVERLOADED: "服务器负荷较重",
+    ForumOutcome.INVALID_REQUEST: "请求无效",
+    ForumOutcome.UNKNOWN: "未知失败",
+}
+
+
+async def daily_single_async(user: str, loop, executor):
+    """一个账户: 先签到再打工, 返回 (签到结果, 打工结果), 均为 ForumOutcome"""
+    say(user, "%s正在签到+打工" % datetime.now())
+    signed = worked = ForumOutcome.UNKNOWN
+    try:
+        signed = await loop.run_in_executor(executor, functools.partial(sign_single_post_v2, user))
+    except Exception as e:
+        say(user, "%s====post签到出错: %s===" % (datetime.now(), e))
+    try:
+        worked = await work_single_async(user, loop, executor)
+    except Exception as e:
+        say(user, "====post打工出错: %s=====" % e)
+    return signed, worked
+
+
+def daily_multi_post():
+    store = default_store()
+    users = store.users(tsdm_domain)
+
+    started = time.time()
+    live, dead = filter_live_users(users)
+    results = dict(zip(live, run_work(live, daily_single_async)))
+    for user in dead:
+        results[user] = (ForumOutcome.LOGGED_OUT, ForumOutcome.LOGGED_OUT)
+
+    print("======== 签到 / 打工 结果 ========")
+    for user in users:
+        signed, worked = results[user]
+        print("%s: 签到%s, 打工%s" % (user, OUTCOME_TEXT[signed], OUTCOME_TEXT[worked]))
+
+    if store.save():
+        print("已写回更新的cookies")
+    print("POST方式: 全部签到+打工完成, %s个账户 (跳过失效%s个), 耗时%.1f秒" % (len(live), len(dead), time.time() - started))
+    print(transport().summary())
+    return [results[user] for user in users]
+
+
+# 云函数入口: 热启动时沿用已解析的 cookies 与 keep-alive 连接池, 并打印冷/热启动耗时
+main_handler = serverless(daily_multi_post)
+
+
+if __name__ == '__main__':
+    daily_multi_post()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+通用 Discuz 论坛多人签到 (天使动漫 + Stage1st), 经 ../cronkit/discuz.py 一次并发完成所有论坛与账户
+论坛差异写在下方 FORUMS 数据里 (cookie 域名, formhash 页面, 签到请求, 结果片语), 新增论坛只需加一项
+cookies.json 中哪个账户有哪个论坛域名的 cookie, 就为它签哪个论坛 (同一用户名下可同时有多个论坛)
+每个论坛各自一个 keep-alive 连接池, 同一论坛同时最多 concurrency 个账户
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cronkit.handler import serverless  # 不导入 requests, 第一次发请求时才加载
+from cronkit.classify import ForumOutcome
+from cronkit.cookies import default_store
+from cronkit.discuz import Forum, forum_transport, run_forums
+
+import SCF_sign
+from SCF_sign import s1_domain
+
+# ======== FORUMS ========
+
+FORUMS = [
+    SCF_sign.tsdm_forum,  # 与 SCF_sign / SCF_daily 共用同一份天使动漫设定
+    Forum(
+        name="saraba1st",
+        cookie_domain=s1_domain,
+        formhash_url="https://bbs.saraba1st.com/2b/forum.php",
+        # study_daily_attendance 插件: GET 带 fhash 即签到
+        sign_url="https://bbs.saraba1st.com/2b/study_daily_attendance-daily_attendance.html?fhash={formhash}",
+        sign_method="GET",
+        referer="https://bbs.saraba1st.com/2b/forum.php",
+        rules=[
+            ("签到成功", ForumOutcome.SUCCESS),
+            ("已签到", ForumOutcome.ALREADY_DONE),
+            ("已经签到", ForumOutcome.ALREADY_DONE),
+            ("请先登录", ForumOutcome.LOGGED_OUT),
+            ("您需要先登录才能继续本操作", ForumOutcome.LOGGED_OUT),
+            ("未定义操作", ForumOutcome.INVALID_REQUEST),
+        ],
+    ),
+]
+
+
+def discuz_multi_sign():
+    store = default_store()
+    started = time.time()
+    results = run_forums(FORUMS, store)
+
+    print("======== 论坛签到结果 ========")
+    relogin = []
+    for forum, user, outcome, detail in results:
+        print("[%s] %s: %s" % (forum.name, user, outcome.value))
+        if outcome is ForumOutcome.UNKNOWN:
+            print("    %s" % detail)
+        elif outcome is ForumOutcome.LOGGED_OUT:
+            relogin.append("%s/%s" % (forum.name, user))
+    if relogin:
+        print("需要重新登录: %s" % ", ".join(relogin))
+
+    if store.save():
+        print("已写回更新的cookies")
+    for forum in FORUMS:
+        if any(r[0] is forum for r in results):
+            print("[%s] %s" % (forum.name, forum_transport(forum).summary()))
+    print("全部论坛签到完成, %s个账户次, 耗时%.1f秒" % (len(results), time.time() - started))
+    return results
+
+
+# 云函数入口: 热启动时沿用已解析的 cookies 与各论坛连接池, 并打印冷/热启动耗时
+main_handler = serverless(discuz_multi_sign)
+
+if __name__ == '__main__':
+    discuz_multi_sign()
@@ -2,15 +2,24 @@
 
 """
 TSDM-coin-farmer
-适配云函数, 单个文件完成天使动漫多人打工
-requests方式
+适配云函数, 单个文件完成天使动漫多人打工, 多账户以 asyncio 交错进行 (TSDM_WORK_CONCURRENCY 控制同时打工账户数, 默认 8)
+requests方式, 经 ../cronkit/transport.py 共用 keep-alive 连接池 (部署时需一并上传 cronkit)
+cookies.json 经 ../cronkit/cookies.py 读取, 响应中的 Set-Cookie 会写回文件
+打工前先并发检查所有账户 cookie, 失效账户跳过并列出需要重新登录的账户 (TSDM_PROBE=0 关闭)
 cookies.json的例子见 https://github.com/Trojblue/TSDM-coin-farmer/blob/main/doc/cookies.json.example
 """
 
 
-import json, random, requests, time
+import asyncio, functools, os, random, re, sys, time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cronkit.handler import say, serverless, transport  # 不导入 requests, 第一次发请求时才加载
+from cronkit.classify import Classifier, ForumOutcome
+from cronkit.cookies import default_store
+from cronkit.pagescan import scan
+
 # ======== CONSTANT ========
 sign_url = 'https://www.tsdm39.com/plugin.php?id=dsu_paulsign:sign'
 work_url = 'https://www.tsdm39.com/plugin.php?id=np_cliworkdz:work'
@@ -20,119 +29,185 @@ tsdm_domain = ".tsdm39.com"
 s1_domain = "bbs.saraba1st.com"
 
 
-# ========= COOKIE ========
 
-def get_cookies_all():
-    """从文件读取所有cookies
-    { username: [cookie_list] }
+# ======= WORK ======
+# 多账户交错打工: 每个账户是一个协程, 点击间隔用 asyncio.sleep 让出, 阻塞的 requests 调用放进线程池,
+# 一个账户等待间隔时其他账户在发请求, N 个账户的总耗时接近单个账户.
+# 同一账户两次 clickad 之间至少间隔 CLICK_INTERVAL (反作弊检查), 账户之间不受此限制.
+
+CLICK_INTERVAL = (0.5, 1)   # 同一账户两次点击的间隔范围(秒)
+CLICK_TIMES = 7             # 首次点击之后再点 7 次: 总共6次打工, 实际打工8次保险
+WORK_CONCURRENCY = int(os.environ.get("TSDM_WORK_CONCURRENCY", "8") or 8)  # 同时打工的账户数上限
+
+work_headers = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; WOW64; Trident/7.0; rv:11.0) like Gecko',
+    'connection': 'Keep-Alive',
+    'x-requested-with': 'XMLHttpRequest',
+    'referer': 'https://www.tsdm39.com/plugin.php?id=np_cliworkdz:work',
+    'content-type': 'application/x-www-form-urlencoded'  # 必须要这个content-type, 否则没法接收
+}
+
+# 打工结果片语 (clickad 与 getcre 的响应), 同时出现多个时靠前者优先
+work_classifier = Classifier([
+    ("您已经成功领取了奖励天使币", ForumOutcome.SUCCESS),
+    ("必须与上一次间隔", ForumOutcome.ALREADY_DONE),
+    ("作弊", ForumOutcome.CHEAT_FLAG),
+    ("请先登录再进行点击任务", ForumOutcome.LOGGED_OUT),
+    ("服务器负荷较重", ForumOutcome.OVERLOADED),
+])
+
+WORK_MESSAGES = {
+    ForumOutcome.SUCCESS: "打工成功",
+    ForumOutcome.CHEAT_FLAG: "作弊判定, 打工失败, 重试...",
+    ForumOutcome.LOGGED_OUT: "打工失败, cookie失效...",
+    ForumOutcome.OVERLOADED: "打工失败, TSDM:\"服务器负荷较重，操作超时\"...",
+}
+
+
+async def work_single_async(user: str, loop, executor):
+    """协程方式为一个账户打工, 点击间隔期间让出给其他账户
+    user: cookies.json 中的用户名
     """
-    try:
-        with open('cookies.json', 'r', encoding='utf-8') as json_file:
-            data = json.load(json_file)
-            return data
+    store = default_store()
+    headers = dict(work_headers, cookie=store.header(tsdm_domain, user))
+    http = transport()
 
-    except FileNotFoundError:  # 文件不存在
-        print("cookies.json不存在")
-        return {}
+    def call(method, data=None):
+        response = method(work_url, data=data, headers=headers)
+        store.update_from_response(tsdm_domain, user, response)
+        return response
 
+    def post(data):
+        return loop.run_in_executor(executor, functools.partial(call, http.post, data))
 
-def get_cookies_by_domain(domain: str):
-    """从所有cookie里分离出指定域名的cookie
-    domain: cookie_list domain, (".tsdm39.com")
-    """
-    cookies_all = get_cookies_all()  # { username: [cookie_list] }
-    domain_cookies = {}
+    # 打工之前必须访问过一次网页
+    await loop.run_in_executor(executor, functools.partial(call, http.get))
 
-    for username in cookies_all.keys():
-        curr_user_cookies = cookies_all[username]
-        curr_user_cookies_domained = []
+    ad_feedback = await post("act=clickad")
+    if work_classifier.classify(ad_feedback.text) is ForumOutcome.ALREADY_DONE:
+        say(user, "该账户已经打工过")
+        return ForumOutcome.ALREADY_DONE
 
-        # 同一个用户名下可能有多个网站的cookie
-        for cookie in curr_user_cookies:
-            if cookie['domain'] == domain:
-                curr_user_cookies_domained.append(cookie)
+    for i in range(CLICK_TIMES):
+        # 从上一次点击返回起算, 保证同一账户的最小间隔
+        wait_time = round(random.uniform(*CLICK_INTERVAL), 2)
+        await asyncio.sleep(wait_time)
+        ad_feedback = await post("act=clickad")
+        say(user, "点击广告: 第%s次, 等待%s秒, 服务器标识:%s" % (i + 2, wait_time, ad_feedback.text))
 
-        if curr_user_cookies_domained != []:
-            domain_cookies[username] = curr_user_cookies_domained
+        if int(ad_feedback.text) > 1629134400:
+            say(user, "检测到作弊判定, 请尝试重新运行")
+            break
+        elif int(ad_feedback.text) >= 6:  # 已点击6次, 停止
+            break
+
+    getcre_response = await post("act=getcre")
 
-    return domain_cookies
+    outcome = work_classifier.classify(getcre_response.text)
+    if outcome in WORK_MESSAGES:
+        say(user, WORK_MESSAGES[outcome])
+    else:
+        say(user, "======未知原因打工失败, 已保存response=======")
+        say(user, "打工 %s" % getcre_response.text)
 
+    return outcome
+
+
+async def work_account(user: str, loop, executor):
+    say(user, "正在打工")
+    try:
+        return await work_single_async(user, loop, executor)
+    except Exception as e:
+        say(user, "====post打工出错: %s=====" % e)
 
-# ======= WORK ======
 
-def work_single_post(cookie: List):
-    """用post方式为一个账户打工
-    cookie_list: List[Dict]
+async def work_all_async(users: List[str], loop, executor, job=None):
+    """交错执行所有账户, 最多 WORK_CONCURRENCY 个账户同时进行
+    job: 每个账户执行的协程函数 job(user, loop, executor), 默认为 work_account
     """
-    cookie_serialized = "; ".join([i['name'] + "=" + i['value'] for i in cookie])
-
-    # 必须要这个content-type, 否则没法接收
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; WOW64; Trident/7.0; rv:11.0) like Gecko',
-        'cookie': cookie_serialized,
-        'connection': 'Keep-Alive',
-        'x-requested-with': 'XMLHttpRequest',
-        'referer': 'https://www.tsdm39.com/plugin.php?id=np_cliworkdz:work',
-        'content-type': 'application/x-www-form-urlencoded'
-    }
+    job = job or work_account
+    limit = asyncio.Semaphore(max(1, WORK_CONCURRENCY))
 
-    # 打工之前必须访问过一次网页
-    requests.get(work_url, headers=headers)
+    async def one(user):
+        async with limit:
+            return await job(user, loop, executor)
 
-    ad_feedback = requests.post(work_url, data="act=clickad", headers=headers)
-    if "必须与上一次间隔" in ad_feedback.text:
-        print("该账户已经打工过")
-        return
+    return await asyncio.gather(*[one(user) for user in users])
 
-    for i in range(7):  # 总共6次打工, 实际打工8次保险
-        ad_feedback = requests.post(work_url, data="act=clickad", headers=headers)
 
-        wait_time = round(random.uniform(0.5, 1), 2)
-        print("点击广告: 第%s次, 等待%s秒, 服务器标识:%s" % (i + 2, wait_time, ad_feedback.text), end="\r")
-        print("点击广告: 第%s次, 等待%s秒, 服务器标识:%s" % (i + 2, wait_time, ad_feedback.text))
-        time.sleep(wait_time)
+def run_work(users: List[str], job=None):
+    """python3.6 没有 asyncio.run, 用 run_until_complete 驱动"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    executor = ThreadPoolExecutor(max_workers=max(1, WORK_CONCURRENCY))
+    try:
+        return loop.run_until_complete(work_all_async(users, loop, executor, job))
+    finally:
+        executor.shutdown(wait=True)
+        loop.close()
 
-        if int(ad_feedback.text) > 1629134400:
-            print("检测到作弊判定, 请尝试重新运行")
-            break
-        elif int(ad_feedback.text) >= 6:  # 已点击6次, 停止
-            break
-        else:
-            continue
-
-    getcre_response = requests.post(work_url, data="act=getcre", headers=headers)
-
-    if "您已经成功领取了奖励天使币" in getcre_response.text:
-        print("打工成功")
-        return True
-    elif "作弊" in getcre_response.text:
-        print("作弊判定, 打工失败, 重试...")
-    elif "请先登录再进行点击任务" in getcre_response.text:
-        print("打工失败, cookie失效...")
-    elif "服务器负荷较重" in getcre_response.text:
-        print("打工失败, TSDM:\"服务器负荷较重，操作超时\"...")
-    else:
-        print("======未知原因打工失败, 已保存response=======")
-        print("打工", getcre_response.text)
 
-    return False
+def work_single_post(user: str):
+    """用post方式为一个账户打工 (单账户入口)
+    user: cookies.json 中的用户名
+    """
+    return run_work([user])[0]
+
+
+# ======= COOKIE 存活检查 ======
+# 打工前先并发探测所有账户: 每个账户只流式读取打工页开头, 顶栏出现登出链接 (action=logout) 即 cookie 有效,
+# 出现登录链接 (action=login) 即已失效, 直接跳过, 不再浪费约10次请求与数秒点击间隔.
+# 无法判断 (网络错误 / 页面异常) 时保留该账户照常执行. TSDM_PROBE=0 可关闭检查.
+
+PROBE_ENABLED = os.environ.get("TSDM_PROBE", "1") != "0"
+LOGIN_STATE_RE = re.compile(rb'action=(logout|login)\b')
+
+
+def probe_cookie(user: str):
+    """返回 True (有效) / False (失效, 需重新登录) / None (无法判断)"""
+    store = default_store()
+    headers = dict(work_headers, cookie=store.header(tsdm_domain, user))
+    try:
+        response = transport().get(work_url, headers=headers, stream=True)
+        store.update_from_response(tsdm_domain, user, response)
+        state, _ = scan(response, LOGIN_STATE_RE)
+    except Exception as e:
+        say(user, "cookie检查出错: %s" % e)
+        return None
+    if state is None:
+        return None
+    return state == b"logout"
+
+
+def filter_live_users(users: List[str]):
+    """并发检查所有账户的 cookie, 返回 (可继续的账户, 需重新登录的账户)"""
+    if not PROBE_ENABLED or not users:
+        return list(users), []
+    with ThreadPoolExecutor(max_workers=max(1, WORK_CONCURRENCY)) as executor:
+        states = list(executor.map(probe_cookie, users))
+    live = [user for user, state in zip(users, states) if state is not False]
+    dead = [user for user, state in zip(users, states) if state is False]
+    if dead:
+        print("以下%s个账户cookie已失效, 已跳过, 请重新登录 (%s): %s" % (len(dead), login_url, ", ".join(dead)))
+    return live, dead
 
 
 def work_multi_post():
-    cookies = get_cookies_by_domain(tsdm_domain)
+    store = default_store()
+    users = store.users(tsdm_domain)
 
-    for user in cookies.keys():
-        print("正在打工: %s" % user)
-        try:
-            work_single_post(cookies[user])
-        except Exception as e:
-            print("====post打工出错: %s=====" % e)
+    started = time.time()
+    users, dead = filter_live_users(users)
+    run_work(users)
 
-    print("POST方式: 全部打工完成")
+    if store.save():
+        print("已写回更新的cookies")
+    print("POST方式: 全部打工完成, %s个账户 (跳过失效%s个), 耗时%.1f秒" % (len(users), len(dead), time.time() - started))
+    print(transport().summary())
     return
 
-def main_handler(event, context):
-    work_multi_post()
-    
+# 云函数入口: 热启动时沿用已解析的 cookies 与 keep-alive 连接池, 并打印冷/热启动耗时
+main_handler = serverless(work_multi_post)
+
 if __name__ == '__main__':
     work_multi_post()
\ No newline at end of file
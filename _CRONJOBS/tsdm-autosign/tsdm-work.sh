@@ -4,6 +4,8 @@
 # desc: tsdm自动签到脚本。 
 # 修改自 https://github.com/trojblue/TSDM-coin-farmer 和 https://github.com/trojblue/TSDM-coin-farmer/pull/20
 # 抽取其中重點部分，並將其修改為適合local執行的腳本。
-docker run --rm -it -v "$(pwd):/app" python:3.6 /bin/bash -c "pip install -r /app/requirements.txt && cd /app && python /app/SCF_sign.py && python /app/SCF_work.py" > output.log 2>&1
+# 掛載上層 _CRONJOBS 以取得共用的 cronkit 套件
+# SCF_daily.py 每個帳號一次完成簽到 + 打工（單獨執行仍可用 SCF_sign.py / SCF_work.py）
+docker run --rm -it -v "$(pwd)/..:/app" python:3.6 /bin/bash -c "pip install -r /app/tsdm-autosign/requirements.txt && cd /app/tsdm-autosign && python SCF_daily.py" > output.log 2>&1
 
 
@@ -2,24 +2,47 @@
 """Read-only Docker/Homepage readiness inventory.
 
 Outputs container metadata useful for planning Homepage labels. Does not inspect env vars.
+
+All running containers are inspected in one batched `docker inspect` call (chunked for very
+large hosts), not one CLI process per container. The time taken is reported on stderr, so
+stdout stays the clean JSON that generate-private-inventory.sh redirects to a file.
 """
 from __future__ import annotations
 
 import json
 import subprocess
 import sys
+import time
+
+INSPECT_BATCH = 500  # names per `docker inspect` call, well under ARG_MAX
 
 
 def run(cmd: list[str]) -> str:
     return subprocess.check_output(cmd, text=True)
 
 
+def inspect_all(names: list[str]) -> dict[str, dict]:
+    """name -> inspect data. Containers removed between `ps` and `inspect` are skipped: docker
+    exits non-zero for them but still prints the objects it found."""
+    found = {}
+    for i in range(0, len(names), INSPECT_BATCH):
+        proc = subprocess.run(["docker", "inspect", *names[i:i + INSPECT_BATCH]], capture_output=True, text=True)
+        if proc.returncode != 0 and not proc.stdout.strip():
+            raise subprocess.CalledProcessError(proc.returncode, proc.args, proc.stdout, proc.stderr)
+        for data in json.loads(proc.stdout or "[]"):
+            found[(data.get("Name") or "").lstrip("/")] = data
+    return found
+
+
 def main() -> int:
+    started = time.perf_counter()
     names = run(["docker", "ps", "--format", "{{.Names}}"]).splitlines()
+    inspected = inspect_all(sorted(names))
     out = []
     for name in sorted(names):
-        raw = run(["docker", "inspect", name])
-        data = json.loads(raw)[0]
+        data = inspected.get(name)
+        if data is None:
+            continue
         cfg = data.get("Config") or {}
         host = data.get("HostConfig") or {}
         state = data.get("State") or {}
@@ -37,6 +60,8 @@ def main() -> int:
         })
     json.dump(out, sys.stdout, ensure_ascii=False, indent=2)
     print()
+    calls = 1 + -(-len(names) // INSPECT_BATCH)
+    print(f"inspected {len(out)} containers in {time.perf_counter() - started:.2f}s ({calls} docker calls)", file=sys.stderr)
     return 0
 
 if __name__ == "__main__":
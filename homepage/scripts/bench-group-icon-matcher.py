@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Benchmark generate-services-from-inventory.resolve() against the original group_for/icon_for loops.
+
+Builds a synthetic inventory (default 10k containers + 10k NPM routes) from the generator's own
+keyword tables plus filler words, checks that resolve() picks exactly the group and icon the
+original nested loops would for every card, then times both:
+
+    python3 scripts/bench-group-icon-matcher.py [--containers 10000] [--routes 10000] [--repeat 5]
+
+Exits non-zero on any mismatch.
+"""
+from __future__ import annotations
+import argparse, importlib.util, random, sys, timeit
+from pathlib import Path
+
+spec = importlib.util.spec_from_file_location('gen', Path(__file__).with_name('generate-services-from-inventory.py'))
+gen = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(gen)
+
+FILLER = ['app', 'web', 'svc', 'stack', 'worker', 'frontend', 'backend', 'x1', 'home', 'lab', 'edge']
+
+
+# The pre-resolve() implementation, kept verbatim as the reference.
+def group_for(*parts):
+    t = ' '.join(p or '' for p in parts).lower()
+    for group, keys in gen.GROUP_RULES:
+        if any(k in t for k in keys): return group
+    return 'Core Infrastructure'
+def icon_for(*parts):
+    t = ' '.join(p or '' for p in parts).lower()
+    for k, v in gen.ICON_MAP.items():
+        if k in t: return v
+    return 'mdi-docker'
+def original(*parts): return group_for(*parts), icon_for(*parts)
+
+
+def synthetic_parts(containers, routes, seed):
+    """Card keyword tuples in the shapes the loaders pass: docker (project, service, name, image), npm (domain, endpoint)."""
+    rng = random.Random(seed)
+    words = sorted({k for _, keys in gen.GROUP_RULES for k in keys} | set(gen.ICON_MAP)) + FILLER * 4
+    pick = lambda: rng.choice(words).replace(' ', '-')
+    cards = []
+    for i in range(containers):
+        project = rng.choice(['<no-compose>', pick(), f'stack{i % 40}'])
+        service = f'{pick()}-{pick()}'
+        cards.append((project, service, f'{service}-{i}', f'ghcr.io/{pick()}/{pick()}:latest'))
+    for i in range(routes):
+        cards.append((f'{pick()}{i}.dfder.tw', f'192.168.10.{i % 250}:{rng.randint(1000, 60000)}'))
+    return cards
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--containers', type=int, default=10000)
+    ap.add_argument('--routes', type=int, default=10000)
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args(argv)
+
+    cards = synthetic_parts(args.containers, args.routes, args.seed)
+    bad = [parts for parts in cards if gen.resolve(*parts) != original(*parts)]
+    if bad:
+        print(f'{len(bad)} mismatches, e.g. {bad[0]}: resolve={gen.resolve(*bad[0])} original={original(*bad[0])}')
+        return 1
+
+    timings = {}
+    for label, fn in (('original', original), ('resolve', gen.resolve)):
+        timings[label] = min(timeit.repeat(lambda: [fn(*parts) for parts in cards], number=1, repeat=args.repeat))
+    print(f'{len(cards)} cards ({args.containers} containers, {args.routes} routes), identical results')
+    for label, secs in timings.items():
+        print(f'  {label:9} {secs * 1000:8.1f} ms  {secs / len(cards) * 1e6:6.2f} us/card')
+    print(f'  speedup   x{timings["original"] / timings["resolve"]:.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Benchmark the homepage scripts on synthetic inventories and fail on regressions.
+
+The real inputs live in gitignored inventory/private, so each scale gets a throwaway tree that
+mirrors the repo layout (scripts/, inventory/private/, config-template/themes/) with synthetic data:
+
+- N containers (port maps, compose labels, some homepage.* labels, some stopped);
+- M NPM proxy-host CSV rows, roughly half forwarding to a container's published port;
+- K Heimdall items, both as the safe-export JSON and as a fake Heimdall SQLite DB
+  (items / applications / item_tag, tags being type-1 items);
+- K/10 theme palettes for validate-theme-presets.py.
+
+Every script runs as a subprocess of the copied tree, exactly as a user would invoke it, so
+timings include interpreter start-up. Wall time is the best of --repeat runs, and peak memory
+is the child's own high-water RSS. Both are compared against the stored baseline:
+
+    python3 scripts/bench-homepage-scripts.py                  # compare against bench-baseline.json
+    python3 scripts/bench-homepage-scripts.py --save-baseline  # record this machine's numbers
+"""
+from __future__ import annotations
+import argparse, csv, json, random, shutil, sqlite3, subprocess, sys, tempfile, time
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent
+BASELINE = SCRIPTS / 'bench-baseline.json'
+COPY = ['generate-services-from-inventory.py', 'export-heimdall-safe.py', 'render-phase2-summary.py', 'validate-theme-presets.py']
+WORDS = ['jellyfin', 'grafana', 'redis', 'immich', 'nextcloud', 'portainer', 'chat', 'qbittorrent', 'postgres',
+         'nginx', 'uptime', 'alist', 'backrest', 'suwayomi', 'app', 'worker', 'api', 'web', 'db', 'cache']
+WEB_PORTS = ['80', '3000', '5000', '8000', '8080', '8096', '9000']
+PALETTE = {'hp-page-bg': '#1e1e2e', 'hp-surface': 'rgba(49, 50, 68, 0.96)', 'hp-text': '#eceff4',
+           'hp-muted': '#d8dee9', 'hp-heading': '#88c0d0', 'hp-accent': '#8fbcbb'}
+
+
+# ---- Synthetic inventory -------------------------------------------------------
+
+def synth_containers(n, rng):
+    out = []
+    for i in range(n):
+        name = f'{rng.choice(WORDS)}-{i}'
+        project = rng.choice([None, f'stack{i % 25}', f'{rng.choice(WORDS)}'])
+        ports = {f'{rng.choice(WEB_PORTS)}/tcp': [{'HostIp': '0.0.0.0', 'HostPort': str(10000 + i)}]} if i % 3 else {}
+        if i % 5 == 0:
+            ports['6379/tcp'] = None
+        out.append({
+            'name': name, 'image': f'ghcr.io/{rng.choice(WORDS)}/{rng.choice(WORDS)}:latest',
+            'status': 'running' if i % 10 else 'exited', 'health': rng.choice([None, 'healthy']), 'ports': ports,
+            'homepage_labels': {'homepage.group': 'Media', 'homepage.name': name} if i % 7 == 0 else {},
+            'compose_project': project, 'compose_service': name if project else None, 'network_mode': 'bridge',
+        })
+    return out
+
+
+def write_npm_csv(path, m, n, rng):
+    with path.open('w', newline='') as f:
+        w = csv.DictWriter(f, ['id', 'enabled', 'domain_names', 'forward_scheme', 'forward_host', 'forward_port'])
+        w.writeheader()
+        for i in range(m):
+            port = 10000 + rng.randrange(max(1, n)) if i % 2 else rng.randrange(1024, 65535)
+            w.writerow({'id': i, 'enabled': '1' if i % 9 else '0', 'domain_names': json.dumps([f'{rng.choice(WORDS)}{i}.dfder.tw']),
+                        'forward_scheme': 'http', 'forward_host': '192.168.10.13' if i % 2 else f'10.0.0.{i % 250}',
+                        'forward_port': str(port)})
+
+
+def heimdall_rows(k, rng):
+    """(items, tags) in Heimdall's shape: links are type 0, tags are type 1."""
+    tags = [{'id': k + t + 1, 'title': f'tag{t}'} for t in range(max(1, k // 20))]
+    items = [{'id': i + 1, 'title': f'{rng.choice(WORDS).title()} {i}', 'url': f'https://{rng.choice(WORDS)}{i}.example.lan/',
+              'type': 0, 'appid': f'app{i % 40}', 'order': i} for i in range(k)]
+    return items, tags
+
+
+def write_heimdall_db(path, items, tags, rng):
+    conn = sqlite3.connect(str(path))
+    conn.executescript('''
+        create table items (id integer primary key, title text, colour text, icon text, url text, description text,
+            pinned integer, "order" integer, created_at text, updated_at text, deleted_at text, type integer,
+            user_id integer, class text, appid text, appdescription text, role text);
+        create table applications (appid text primary key, name text, sha text, icon text, website text,
+            license text, description text, enhanced integer, tile_background text, "class" text);
+        create table item_tag (item_id integer, tag_id integer, created_at text, updated_at text);
+    ''')
+    now = '2026-01-01 00:00:00'
+    conn.executemany('insert into items (id, title, colour, icon, url, description, pinned, "order", created_at, updated_at, type, class, appid, appdescription, role) '
+                     'values (?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?)',
+                     [(it['id'], it['title'], '#161b1f', f'icons/{it["appid"]}.png', it['url'],
+                       f'login admin password: hunter{it["id"]} token=sk-{"x" * 20}', it['order'], now, now, 0,
+                       'App\\SupportedApps\\Generic', it['appid'], 'notes', 'admin') for it in items]
+                     + [(t['id'], t['title'], '#000000', None, None, None, t['id'], now, now, 1, None, None, None, None)
+                        for t in tags])
+    conn.executemany('insert into applications (appid, name, icon, website, description) values (?, ?, ?, ?, ?)',
+                     [(f'app{a}', f'App {a}', f'app{a}.svg', f'https://app{a}.example', 'desc') for a in range(40)])
+    conn.executemany('insert into item_tag (item_id, tag_id, created_at, updated_at) values (?, ?, ?, ?)',
+                     [(it['id'], rng.choice(tags)['id'], now, now) for it in items for _ in range(2)])
+    conn.commit()
+    conn.close()
+
+
+def build_tree(root, n, m, k, seed):
+    """Repo-shaped tree with synthetic inputs; returns the fake Heimdall DB path."""
+    rng = random.Random(seed)
+    (root / 'scripts').mkdir(parents=True)
+    for name in COPY:
+        shutil.copy2(SCRIPTS / name, root / 'scripts' / name)
+    priv = root / 'inventory' / 'private'
+    priv.mkdir(parents=True)
+    (priv / 'docker-homepage-readiness.json').write_text(json.dumps(synth_containers(n, rng), indent=2))
+    write_npm_csv(priv / 'npm-proxy-hosts.safe.csv', m, n, rng)
+    items, tags = heimdall_rows(k, rng)
+    (priv / 'heimdall-items.safe.json').write_text(json.dumps(items, indent=2))
+    db = priv / 'heimdall.sqlite'
+    write_heimdall_db(db, items, tags, rng)
+    for t in range(max(1, k // 10)):
+        theme = root / 'config-template' / 'themes' / f'theme{t}'
+        theme.mkdir(parents=True)
+        theme.joinpath('theme.css').write_text(':root {\n' + ''.join(f'  --{key}: {value};\n' for key, value in PALETTE.items()) + '}\n')
+    return db
+
+
+# ---- Measurement ---------------------------------------------------------------
+
+# Runs the script as __main__ and reports the interpreter's own peak RSS on stderr. On Linux a
+# child's ru_maxrss starts from the parent's RSS at fork (this benchmark holds the synthetic data),
+# whereas VmHWM belongs to the exec'd process alone.
+LAUNCHER = '''
+import resource, runpy, sys
+script = sys.argv[1]
+sys.argv = sys.argv[1:]
+try:
+    runpy.run_path(script, run_name="__main__")
+finally:
+    try:
+        kib = next(int(l.split()[1]) for l in open("/proc/self/status") if l.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == "darwin" else 1)
+    sys.stderr.write(f"\\nBENCH_PEAK_KIB {kib}\\n")
+'''
+
+
+def run_child(argv, cwd):
+    """(seconds, peak RSS MiB) of one script run; raises if it fails."""
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', LAUNCHER, *map(str, argv)], cwd=cwd,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    seconds = time.perf_counter() - started
+    stderr = proc.stderr.decode(errors='replace')
+    if proc.returncode != 0:
+        raise RuntimeError(f'{" ".join(map(str, argv))} exited {proc.returncode}: {stderr[-400:]}')
+    kib = int(stderr.rsplit('BENCH_PEAK_KIB', 1)[1].split()[0])
+    return seconds, kib / 1024
+
+
+def commands(root, db):
+    s, out = root / 'scripts', root / 'out'
+    return {
+        'generate': [s / 'generate-services-from-inventory.py', '--force', '--out', out / 'services.yaml',
+                     '--template-out', out / 'services.generated.yaml', '--report', out / 'report.md'],
+        'export-heimdall': [s / 'export-heimdall-safe.py', '--db', db],
+        'phase2-summary': [s / 'render-phase2-summary.py'],
+        'theme-presets': [s / 'validate-theme-presets.py'],
+    }
+
+
+def bench_scale(n, repeat, seed):
+    m, k = n, max(10, n // 2)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='homepage-bench-') as tmp:
+        root = Path(tmp)
+        db = build_tree(root, n, m, k, seed)
+        for script, argv in commands(root, db).items():
+            runs = [run_child(argv, root) for _ in range(repeat)]
+            results[f'{n}/{script}'] = {'seconds': round(min(r[0] for r in runs), 4),
+                                        'rss_mb': round(max(r[1] for r in runs), 1)}
+    return results
+
+
+def regressions(results, baseline, time_tol, time_slack, mem_tol, mem_slack):
+    out = []
+    for key, r in results.items():
+        b = baseline.get(key)
+        if not b:
+            continue
+        if r['seconds'] > b['seconds'] * (1 + time_tol) + time_slack:
+            out.append(f"{key}: {r['seconds']:.3f}s vs baseline {b['seconds']:.3f}s")
+        if r['rss_mb'] > b['rss_mb'] * (1 + mem_tol) + mem_slack:
+            out.append(f"{key}: {r['rss_mb']:.1f} MiB vs baseline {b['rss_mb']:.1f} MiB")
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--scales', default='100,1000,10000', help='comma-separated N (containers = NPM rows = N, Heimdall items = N/2)')
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--baseline', type=Path, default=BASELINE)
+    ap.add_argument('--save-baseline', action='store_true', help='write these results as the new baseline instead of comparing')
+    ap.add_argument('--time-tolerance', type=float, default=0.5, help='allowed relative slowdown (0.5 = +50%%)')
+    ap.add_argument('--time-slack', type=float, default=0.05, help='extra absolute seconds allowed (start-up noise)')
+    ap.add_argument('--mem-tolerance', type=float, default=0.25)
+    ap.add_argument('--mem-slack', type=float, default=4.0, help='extra absolute MiB allowed')
+    args = ap.parse_args(argv)
+
+    scales = [int(x) for x in args.scales.split(',') if x.strip()]
+    try:
+        baseline = json.loads(args.baseline.read_text()).get('results', {})
+    except (OSError, ValueError):
+        baseline = {}
+
+    results = {}
+    print(f"{'scale/script':28} {'seconds':>9} {'peak MiB':>9} {'baseline s':>11}")
+    for n in scales:
+        for key, r in bench_scale(n, max(1, args.repeat), args.seed).items():
+            results[key] = r
+            b = baseline.get(key)
+            print(f"{key:28} {r['seconds']:9.3f} {r['rss_mb']:9.1f} {b['seconds'] if b else '-':>11}")
+
+    if args.save_baseline:
+        meta = {'python': sys.version.split()[0], 'platform': sys.platform, 'repeat': args.repeat, 'seed': args.seed}
+        args.baseline.write_text(json.dumps({'meta': meta, 'results': {**baseline, **results}}, indent=2, sort_keys=True) + '\n')
+        print(f'baseline written to {args.baseline}')
+        return 0
+    if not baseline:
+        print(f'no baseline at {args.baseline}; run with --save-baseline first')
+        return 0
+    bad = regressions(results, baseline, args.time_tolerance, args.time_slack, args.mem_tolerance, args.mem_slack)
+    for line in bad:
+        print(f'REGRESSION {line}')
+    print('no regressions against baseline' if not bad else f'{len(bad)} regression(s)')
+    return 1 if bad else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Check generate-services-from-inventory.py --live / --watch against a fake Docker Engine API.
+
+Serves /containers/json and /events on a temporary unix socket (no Docker needed), then:
+  * runs the generator with --live and checks every running container got a card;
+  * runs watch() and checks a container start event is published within seconds, re-reading only
+    that container (a filtered list call, not a full rescan) and re-rendering only its group.
+
+    python3 scripts/check-live-docker-mode.py
+
+Exits non-zero on any failure.
+"""
+from __future__ import annotations
+import contextlib, importlib.util, io, json, queue, socketserver, sys, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+spec = importlib.util.spec_from_file_location('gen', Path(__file__).with_name('generate-services-from-inventory.py'))
+gen = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(gen)
+
+
+def summary(i, name, port=None, state='running'):
+    """One /containers/json entry as the Engine API returns it."""
+    return {
+        'Id': f'{i:064x}', 'Names': [f'/{name}'], 'Image': f'example/{name}:1', 'State': state,
+        'Status': 'Up 5 minutes (healthy)' if state == 'running' else 'Exited (0) 1 second ago',
+        'Ports': [{'IP': '0.0.0.0', 'PrivatePort': 8080, 'PublicPort': port, 'Type': 'tcp'}] if port else [],
+        'Labels': {'com.docker.compose.project': 'stack', 'com.docker.compose.service': name},
+        'HostConfig': {'NetworkMode': 'bridge'},
+    }
+
+
+class FakeEngine(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Just enough of the Engine API for DockerAPI: container list (with id filters) and an event stream."""
+    daemon_threads = True
+
+    def __init__(self, path, containers):
+        self.containers = {c['Id']: c for c in containers}
+        self.lists = []        # query string of every /containers/json call
+        self.subscribers = []
+        self.lock = threading.Lock()
+        super().__init__(path, FakeEngineHandler)
+
+    def start(self, c, action='start'):
+        """Add/replace a container and emit its event to every /events subscriber."""
+        with self.lock:
+            self.containers[c['Id']] = c
+            for q in self.subscribers:
+                q.put({'Type': 'container', 'Action': action, 'Actor': {'ID': c['Id']}, 'time': int(time.time())})
+
+
+class FakeEngineHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self):
+        return 'unix'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        u, engine = urlsplit(self.path), self.server
+        if u.path == '/containers/json':
+            qs = parse_qs(u.query)
+            ids = json.loads(qs.get('filters', ['{}'])[0]).get('id')
+            every = qs.get('all', ['0'])[0] == '1'
+            with engine.lock:
+                engine.lists.append(u.query)
+                out = [c for c in engine.containers.values()
+                       if (every or c['State'] == 'running') and (not ids or c['Id'] in ids)]
+            body = json.dumps(out).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif u.path == '/events':
+            q = queue.Queue()
+            with engine.lock:
+                engine.subscribers.append(q)
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            self.wfile.flush()
+            try:
+                while True:
+                    line = (json.dumps(q.get()) + '\n').encode()
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(line), line))
+                    self.wfile.flush()
+            except OSError:
+                pass
+            finally:
+                with engine.lock:
+                    engine.subscribers.remove(q)
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+
+def has_card(text, container):
+    return f'container: {gen.yaml_quote(container)}' in text
+
+
+def check_live(tmp, sock):
+    out = tmp / 'services.yaml'
+    argv = ['--live', '--hosts', str(tmp / 'no-hosts.json'), '--docker-host', f'unix://{sock}',
+            '--out', str(out), '--template-out', str(tmp / 'template.yaml'),
+            '--report', str(tmp / 'report.md'), '--fingerprint', str(tmp / 'fingerprint.json')]
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        rc = gen.main(argv)
+    text = out.read_text() if out.exists() else ''
+    missing = [n for n in ('grafana', 'jellyfin') if not has_card(text, n)]
+    problems = []
+    if rc != 0: problems.append(f'--live exited {rc}')
+    if missing: problems.append(f'--live: no card for {missing}')
+    if has_card(text, 'stopped-app'): problems.append('--live: card for a stopped container')
+    if 'docker=2 ' not in log.getvalue(): problems.append(f'--live: unexpected summary {log.getvalue().strip()!r}')
+    return problems
+
+
+def check_watch(tmp, engine, sock):
+    catalog = gen.LiveCatalog(npm_path=tmp / 'no-npm.csv', heimdall_path=tmp / 'no-heimdall.json')
+    published = queue.Queue()
+
+    def publish(catalog, why):
+        text, _report, stats, rendered = catalog.render()
+        published.put((why, text, stats, rendered))
+
+    api = gen.DockerAPI(f'unix://{sock}')
+    threading.Thread(target=gen.watch, args=(api, catalog, publish, 0.05), daemon=True).start()
+    problems = []
+    try:
+        why, _, stats, _ = published.get(timeout=5)
+        if why != 'initial' or stats['docker'] != 2:
+            problems.append(f'watch: initial render {why!r} with {stats}')
+        lists_before = len(engine.lists)
+        started = time.monotonic()
+        engine.start(summary(9, 'paperless', port=8010))
+        why, text, stats, rendered = published.get(timeout=5)
+        seconds = time.monotonic() - started
+    except queue.Empty:
+        return problems + ['watch: nothing published within 5s']
+    new_lists = engine.lists[lists_before:]
+    paperless = gen.docker_card(gen.container_from_api(summary(9, 'paperless', port=8010)), {})['group']
+    if not has_card(text, 'paperless') or stats['docker'] != 3:
+        problems.append(f'watch: start event not rendered ({why!r}, {stats})')
+    if len(new_lists) != 1 or 'filters=' not in new_lists[0]:
+        problems.append(f'watch: expected one filtered list call after the event, got {new_lists}')
+    if rendered != [paperless]:
+        problems.append(f'watch: re-rendered {rendered}, expected only {paperless!r}')
+    print(f'watch: start event published in {seconds * 1000:.0f} ms; re-rendered {rendered}')
+    return problems
+
+
+def main():
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        sock = tmp / 'docker.sock'
+        engine = FakeEngine(str(sock), [summary(1, 'grafana', port=3000), summary(2, 'jellyfin', port=8096),
+                                        summary(3, 'stopped-app', state='exited')])
+        threading.Thread(target=engine.serve_forever, daemon=True).start()
+        problems = check_live(tmp, sock) + check_watch(tmp, engine, sock)
+        # The watch threads are daemons and the event stream stays open until the process exits.
+    for p in problems:
+        print(f'FAIL {p}', file=sys.stderr)
+    if not problems:
+        print('live/watch mode OK')
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,14 +1,52 @@
 #!/usr/bin/env python3
+"""Generate Homepage services.yaml (and the catalog report) from private inventory.
+
+Stages are importable: load_npm / load_heimdall / load_docker -> merge_items ->
+render_services / render_report. main() fingerprints the inputs (NPM CSV, Heimdall JSON,
+Docker readiness JSON and this script) and skips everything when nothing changed since the
+last run; outputs are written atomically and only when their rendered content differs, so
+Homepage does not reload an unchanged config. Use --force to regenerate regardless.
+
+--live reads the running containers straight from the Docker Engine API (one list call over the
+unix socket, or a tcp:// socket-proxy) instead of the readiness JSON. --watch keeps running,
+subscribes to the daemon's container start/stop/die/rename events and, after a short debounce,
+re-lists only the containers named in those events. Every batch still re-merges and re-renders the
+whole catalog (and rewrites nothing when the result is unchanged); only the YAML of groups whose
+cards are identical is reused. NPM/Heimdall inputs are read once at startup in watch mode.
+
+--probe checks every siteMonitor URL before it goes onto the dashboard (asyncio, bounded overall
+and per host, results cached for --probe-ttl seconds) and annotates cards whose endpoint is down,
+or with --probe-drop removes them (Docker cards keep their stats and only lose href/siteMonitor).
+The report gains a per-group latency table.
+
+Docker hosts come from inventory/private/docker-hosts.json when it exists (see load_hosts); each
+host is a readiness JSON or an Engine API socket, all are read in parallel, and a container is
+joined to its NPM route through one (host address or alias, port) -> route index. Without that
+file the single local host is used, exactly as before. --live/--watch follow one host: the file's
+only entry when it has one (its socket unless --docker-host is given), and they refuse to run
+against several rather than silently dropping the others from services.yaml.
+"""
 from __future__ import annotations
-import csv, json, re
+import argparse, csv, hashlib, json, math, os, queue, re, socket, sys, tempfile, threading, time
+from functools import lru_cache
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import quote, urlsplit
 
 ROOT = Path(__file__).resolve().parents[1]
 PRIV = ROOT / 'inventory/private'
 OUT = Path('/mnt/appdata/homepage/config/services.yaml')
 TEMPLATE_OUT = ROOT / 'config-template/config/services.generated.yaml'
 REPORT = ROOT / 'docs/16-stage2-service-catalog-report.md'
+NPM_CSV = PRIV / 'npm-proxy-hosts.safe.csv'
+HEIMDALL_JSON = PRIV / 'heimdall-items.safe.json'
+DOCKER_JSON = PRIV / 'docker-homepage-readiness.json'
+FINGERPRINT = PRIV / '.services-generator.fingerprint.json'
+HOSTS_JSON = PRIV / 'docker-hosts.json'
+PROBE_CACHE = PRIV / '.sitemonitor-probe-cache.json'
+DOCKER_HOST = os.environ.get('DOCKER_HOST') or 'unix:///var/run/docker.sock'
+WATCH_ACTIONS = ('start', 'stop', 'die', 'rename')
+# asyncio/ssl (--probe), http.client (Docker API) and concurrent.futures (socket hosts) are imported
+# where used: together they add ~0.13s of start-up to every plain file-based run.
 
 GROUP_RULES = [
     ('Network & Ingress', ['nginx', 'proxy', 'cloudflare', 'cloudflared', 'adguard', 'tailscale', 'vproxy', 'gluetun', 'flaresolverr']),
@@ -70,16 +108,21 @@ def title_from_domain(d):
     d = d.lower().strip()
     if d.endswith('.dfder.tw'): d = d[:-9]
     return labelize(d)
-def group_for(*parts):
+# GROUP_RULES / ICON_MAP flattened once into priority-ordered (keyword, value) tables: the first
+# keyword found in the haystack wins, exactly as the nested loops over the tables would decide.
+_GROUP_KEYS = tuple((k, group) for group, keys in GROUP_RULES for k in keys)
+_ICON_KEYS = tuple(ICON_MAP.items())
+def resolve(*parts):
+    """(group, icon) for one card: the parts are joined and lower-cased once for both tables."""
     t = ' '.join(p or '' for p in parts).lower()
-    for group, keys in GROUP_RULES:
-        if any(k in t for k in keys): return group
-    return 'Core Infrastructure'
-def icon_for(*parts):
-    t = ' '.join(p or '' for p in parts).lower()
-    for k, v in ICON_MAP.items():
-        if k in t: return v
-    return 'mdi-docker'
+    group, icon = 'Core Infrastructure', 'mdi-docker'
+    for k, v in _GROUP_KEYS:
+        if k in t: group = v; break
+    for k, v in _ICON_KEYS:
+        if k in t: icon = v; break
+    return group, icon
+def group_for(*parts): return resolve(*parts)[0]
+def icon_for(*parts): return resolve(*parts)[1]
 def image_short(image):
     if not image: return ''
     return image.split('@')[0]
@@ -102,12 +145,18 @@ def public_url_key(url):
     u = url.rstrip('/').lower()
     return u
 
-# Public NPM route indexes.
-public_by_endpoint = {}
-public_cards = []
-npm_path = PRIV / 'npm-proxy-hosts.safe.csv'
-if npm_path.exists():
-    with npm_path.open() as f:
+GROUP_ORDER = ['Core Infrastructure','Network & Ingress','Observability','AI & LLM','Media','Downloads & Network','Photos & Files','Databases & Admin','Backup & Maintenance']
+
+
+# ---- Stage 1: load inventories -------------------------------------------------
+
+def load_npm(path=NPM_CSV):
+    """Public NPM routes -> (endpoint 'host:port' -> href, public cards)."""
+    public_by_endpoint = {}
+    public_cards = []
+    if not path.exists():
+        return public_by_endpoint, public_cards
+    with path.open() as f:
         for r in csv.DictReader(f):
             if r.get('enabled') != '1':
                 continue
@@ -119,137 +168,814 @@ if npm_path.exists():
             href = 'https://' + domains[0]
             endpoint = f"{r.get('forward_host')}:{r.get('forward_port')}".lower()
             public_by_endpoint[endpoint] = href
+            group, icon = resolve(domains[0], endpoint)
             public_cards.append({
                 'source': 'npm', 'name': title_from_domain(domains[0]), 'href': href,
-                'group': group_for(domains[0], endpoint), 'icon': icon_for(domains[0], endpoint),
+                'group': group, 'icon': icon,
                 'description': f"Public reverse proxy route to {r.get('forward_scheme')}://{endpoint}",
                 'siteMonitor': href,
             })
+    return public_by_endpoint, public_cards
 
-# Heimdall URL index.
-heimdall_by_url = {}
-heimdall_cards = []
-h_path = PRIV / 'heimdall-items.safe.json'
-if h_path.exists():
-    for r in json.loads(h_path.read_text()):
+
+def load_heimdall(path=HEIMDALL_JSON):
+    """Heimdall safe export -> link cards."""
+    heimdall_cards = []
+    if not path.exists():
+        return heimdall_cards
+    for r in json.loads(path.read_text()):
         if r.get('type') != 0: continue
         url = norm(r.get('url'))
         name = norm(r.get('title'))
         if not url or not name or not re.match(r'https?://', url): continue
-        heimdall_by_url[public_url_key(url)] = name
+        group, icon = resolve(name, url)
         heimdall_cards.append({
-            'source': 'heimdall', 'name': name, 'href': url, 'group': group_for(name, url),
-            'icon': icon_for(name, url), 'description': 'Migrated from Heimdall safe export', 'siteMonitor': url,
+            'source': 'heimdall', 'name': name, 'href': url, 'group': group,
+            'icon': icon, 'description': 'Migrated from Heimdall safe export', 'siteMonitor': url,
         })
+    return heimdall_cards
+
+
+def load_containers(path=DOCKER_JSON):
+    return json.loads(path.read_text()) if path.exists() else []
+
+
+def default_host(source=DOCKER_JSON):
+    return {'name': 'local-docker', 'source': str(source), 'address': 'axolotl.newhome',
+            'aliases': ['192.168.10.13'], 'npm': False}
+
+
+def load_hosts(path=HOSTS_JSON):
+    """Docker hosts to aggregate. docker-hosts.json is a list of
+    {"name": <Homepage docker.yaml server>, "source": <readiness JSON path | unix:// | tcp://>,
+     "address": <host used for fallback hrefs>, "aliases": [<IPs / DNS names NPM forwards to>],
+     "npm": <true if NPM shares this host's Docker networks, so routes to container:port match>}.
+    Relative sources are resolved against the repo root. Without the file: [default_host()]."""
+    if not path.exists():
+        return [default_host()]
+    hosts = []
+    for i, h in enumerate(json.loads(path.read_text())):
+        if not isinstance(h, dict) or not h.get('name') or not h.get('source') or not h.get('address'):
+            raise ValueError(f'{path}: host #{i + 1} needs name, source and address')
+        source = h['source'] if '://' in h['source'] else str(ROOT / h['source'])
+        hosts.append({'name': h['name'], 'source': source, 'address': h['address'],
+                      'aliases': list(h.get('aliases') or []), 'npm': bool(h.get('npm'))})
+    if len({h['name'] for h in hosts}) != len(hosts):
+        raise ValueError(f'{path}: host names must be unique')
+    return hosts
+
 
-# Docker container cards: canonical for every running container.
-docker_cards = []
-docker_path = PRIV / 'docker-homepage-readiness.json'
-containers = json.loads(docker_path.read_text()) if docker_path.exists() else []
-for c in containers:
+def load_host_containers(host):
+    return list(DockerAPI(host['source']).containers().values()) if '://' in host['source'] else load_containers(Path(host['source']))
+
+
+def load_inventories(hosts):
+    """[(host, containers)] for every host, read in parallel (files and sockets alike)."""
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, min(len(hosts), 16))) as pool:
+        return list(zip(hosts, pool.map(load_host_containers, hosts)))
+
+
+def route_for(c, host, hp, public_by_endpoint):
+    """Public route for a container: its published web port on any of the host's addresses, then
+    (when NPM sits on this host's Docker networks) its name or compose service on a container port."""
+    if hp:
+        for addr in [*host['aliases'], host['address']]:
+            href = public_by_endpoint.get(f'{addr}:{hp}'.lower())
+            if href: return href
+    if host.get('npm'):
+        ports = sorted({k.split('/')[0] for k in (c.get('ports') or {})}, key=lambda p: int(p) if p.isdigit() else 0)
+        for n in {c.get('name'), c.get('compose_service')} - {None}:
+            for port in ports:
+                href = public_by_endpoint.get(f'{n}:{port}'.lower())
+                if href: return href
+    return None
+
+
+def docker_card(c, public_by_endpoint, host=None):
+    """One running container -> card (None for anything not running). 'routed' is True when href
+    is the container's NPM route rather than the host-port fallback."""
     if c.get('status') != 'running':
-        continue
+        return None
+    host = host or default_host()
     name = c.get('name') or c.get('compose_service') or 'container'
     project = c.get('compose_project') or '<no-compose>'
     service = c.get('compose_service') or name
     image = image_short(c.get('image'))
-    group = group_for(project, service, name, image)
-    href = None
+    group, icon = resolve(project, service, name, image)
     hp = first_host_port(c.get('ports'))
-    if hp:
-        endpoint = f"192.168.10.13:{hp}".lower()
-        href = public_by_endpoint.get(endpoint) or f"http://axolotl.newhome:{hp}"
+    href = route_for(c, host, hp, public_by_endpoint)
+    routed = href is not None
+    if href is None and hp:
+        href = f"http://{host['address']}:{hp}"
     desc = f"Docker: {project}/{service}"
     if image:
         desc += f" ({image})"
-    docker_cards.append({
+    return {
         'source': 'docker', 'name': name, 'href': href, 'group': group,
-        'icon': icon_for(project, service, name, image), 'description': desc,
-        'server': 'local-docker', 'container': name, 'showStats': True,
-        'siteMonitor': href if href else None,
-    })
-
-# Include public/Heimdall cards not already represented by Docker cards URL-wise.
-seen_urls = {public_url_key(c['href']) for c in docker_cards if c.get('href')}
-items = list(docker_cards)
-for c in public_cards + heimdall_cards:
-    key = public_url_key(c['href'])
-    if key in seen_urls:
-        continue
-    seen_urls.add(key)
-    items.append(c)
-
-# Stable names: prefix duplicates.
-name_count = {}
-for it in items:
-    base = it['name']
-    name_count[base] = name_count.get(base, 0) + 1
-for it in items:
-    if name_count[it['name']] > 1:
-        suffix = it.get('source', 'card')
-        if it.get('source') == 'docker' and it.get('container'):
-            suffix = it['container']
-        it['name'] = f"{it['name']} ({suffix})"
-
-# Group/sort.
-groups = {}
-for it in items:
-    groups.setdefault(it['group'], []).append(it)
-for arr in groups.values():
-    arr.sort(key=lambda x: (x.get('source') != 'docker', x['name'].lower()))
-order = ['Core Infrastructure','Network & Ingress','Observability','AI & LLM','Media','Downloads & Network','Photos & Files','Databases & Admin','Backup & Maintenance']
-for g in sorted(groups):
-    if g not in order: order.append(g)
-
-lines = ['---', '# Generated by scripts/generate-services-from-inventory.py', '# services.yaml-first catalog. Every running Docker container is connected via local-docker stats.', '# Secret-bearing widgets are intentionally not auto-enabled.', '']
-for group in order:
-    arr = groups.get(group, [])
-    if not arr: continue
-    lines.append(f'- {group}:')
+        'icon': icon, 'description': desc,
+        'server': host['name'], 'container': name, 'showStats': True,
+        'siteMonitor': href if href else None, 'routed': routed,
+    }
+
+
+def load_docker(inventories, public_by_endpoint):
+    """Docker container cards, canonical for every running container, from [(host, containers)].
+    The same container reported twice for one host is kept once; when containers on different
+    hosts join to the same public route, the first host keeps it and the others fall back to
+    their own host port."""
+    cards, seen, routed = [], set(), set()
+    for host, containers in inventories:
+        for c in containers:
+            card = docker_card(c, public_by_endpoint, host)
+            if not card or (card['server'], card['container']) in seen:
+                continue
+            seen.add((card['server'], card['container']))
+            if card['routed']:
+                if card['href'] in routed:
+                    hp = first_host_port(c.get('ports'))
+                    card['href'] = card['siteMonitor'] = f"http://{host['address']}:{hp}" if hp else None
+                    card['routed'] = False
+                else:
+                    routed.add(card['href'])
+            cards.append(card)
+    return cards
+
+
+# ---- Stage 1b: live Docker Engine API ------------------------------------------
+
+@lru_cache(maxsize=None)
+def _unix_http_connection():
+    import http.client
+
+    class UnixHTTPConnection(http.client.HTTPConnection):
+        def __init__(self, path, timeout):
+            super().__init__('localhost', timeout=timeout)
+            self.unix_path = path
+
+        def connect(self):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(self.timeout)
+            self.sock.connect(self.unix_path)
+    return UnixHTTPConnection
+
+
+def container_from_api(summary):
+    """/containers/json entry -> the record shape audit-docker-homepage-readiness.py writes."""
+    labels = summary.get('Labels') or {}
+    ports = {}
+    for p in summary.get('Ports') or []:
+        key = f"{p.get('PrivatePort')}/{p.get('Type', 'tcp')}"
+        if not p.get('PublicPort'):
+            ports.setdefault(key, None)  # exposed but unpublished: inspect reports null
+            continue
+        if ports.get(key) is None:
+            ports[key] = []
+        ports[key].append({'HostIp': p.get('IP', ''), 'HostPort': str(p['PublicPort'])})
+    health = re.search(r'\((?:health: )?(healthy|unhealthy|starting)\)', summary.get('Status') or '')
+    return {
+        'name': ((summary.get('Names') or ['/'])[0]).lstrip('/'),
+        'image': summary.get('Image'),
+        'status': summary.get('State'),
+        'health': health.group(1) if health else None,
+        'ports': ports,
+        'homepage_labels': {k: v for k, v in labels.items() if k.startswith('homepage.')},
+        'compose_project': labels.get('com.docker.compose.project'),
+        'compose_service': labels.get('com.docker.compose.service'),
+        'network_mode': (summary.get('HostConfig') or {}).get('NetworkMode'),
+    }
+
+
+class DockerAPI:
+    """Minimal read-only Engine API client: unix:///path/docker.sock or tcp://host:port (socket-proxy).
+    Transport and protocol failures surface as OSError."""
+
+    def __init__(self, host=DOCKER_HOST, timeout=10):
+        import http.client
+        self.protocol_errors = (http.client.HTTPException,)
+        u = urlsplit(host)
+        if u.scheme == 'unix':
+            self.connect = lambda timeout: _unix_http_connection()(u.path, timeout)
+        elif u.scheme in ('tcp', 'http'):
+            self.connect = lambda timeout: http.client.HTTPConnection(u.hostname, u.port or 2375, timeout=timeout)
+        else:
+            raise ValueError(f'unsupported docker host {host!r} (use unix:// or tcp://)')
+        self.host = host
+        self.timeout = timeout
+
+    def _open(self, path, timeout):
+        conn = self.connect(timeout)
+        try:
+            conn.request('GET', path)
+            resp = conn.getresponse()
+            if resp.status != 200:
+                raise OSError(f'docker API GET {path}: HTTP {resp.status} {resp.read()[:200]!r}')
+        except self.protocol_errors as e:
+            conn.close()
+            raise OSError(f'docker API GET {path}: {e!r}') from e
+        except BaseException:
+            conn.close()
+            raise
+        return conn, resp
+
+    def get_json(self, path):
+        conn, resp = self._open(path, self.timeout)
+        try:
+            return json.loads(resp.read())
+        except self.protocol_errors as e:
+            raise OSError(f'docker API GET {path}: {e!r}') from e
+        finally:
+            conn.close()
+
+    def containers(self, ids=None):
+        """Running containers (or, given ids, those containers in any state) -> {id: readiness record}."""
+        path = '/containers/json'
+        if ids is not None:
+            path += '?all=1&filters=' + quote(json.dumps({'id': sorted(ids)}))
+        return {s['Id']: container_from_api(s) for s in self.get_json(path)}
+
+    def events(self, actions=WATCH_ACTIONS):
+        """Subscribe to container events; returns once subscribed, with an iterator over the stream
+        (which the daemon keeps open indefinitely)."""
+        filters = {'type': ['container'], 'event': list(actions)}
+        conn, resp = self._open('/events?filters=' + quote(json.dumps(filters)), None)
+
+        def stream():
+            try:
+                for line in resp:
+                    if line.strip():
+                        yield json.loads(line)
+            except self.protocol_errors as e:
+                raise OSError(f'docker event stream: {e!r}') from e
+            finally:
+                conn.close()
+        return stream()
+
+
+# ---- Stage 2: merge ------------------------------------------------------------
+
+def merge_items(docker_cards, public_cards, heimdall_cards):
+    """Docker cards first, then public/Heimdall cards not already represented URL-wise;
+    duplicate names get a source/container suffix. Returns (items, groups, order)."""
+    seen_urls = {public_url_key(c['href']) for c in docker_cards if c.get('href')}
+    items = [dict(c) for c in docker_cards]
+    for c in public_cards + heimdall_cards:
+        key = public_url_key(c['href'])
+        if key in seen_urls:
+            continue
+        seen_urls.add(key)
+        items.append(dict(c))
+
+    # Stable names: prefix duplicates (docker: container name, plus server when several hosts run it).
+    name_count, servers = {}, {}
+    for it in items:
+        base = it['name']
+        name_count[base] = name_count.get(base, 0) + 1
+        if it.get('source') == 'docker':
+            servers.setdefault(it.get('container'), set()).add(it.get('server'))
+    for it in items:
+        if name_count[it['name']] > 1:
+            suffix = it.get('source', 'card')
+            if it.get('source') == 'docker' and it.get('container'):
+                suffix = it['container']
+                if len(servers[it['container']]) > 1:
+                    suffix += f" @ {it['server']}"
+            it['name'] = f"{it['name']} ({suffix})"
+
+    # Group/sort.
+    groups = {}
+    for it in items:
+        groups.setdefault(it['group'], []).append(it)
+    for arr in groups.values():
+        arr.sort(key=lambda x: (x.get('source') != 'docker', x['name'].lower()))
+    order = list(GROUP_ORDER)
+    for g in sorted(groups):
+        if g not in order: order.append(g)
+    return items, groups, order
+
+
+# ---- Stage 2b: siteMonitor pre-probe ---------------------------------------------
+
+class SiteProbe:
+    """Concurrent liveness check of siteMonitor URLs with a TTL cache.
+
+    An endpoint is up when it answers with any HTTP status below 500 (401/403 login walls count);
+    latency is the time to the status line. Certificates are not verified: this is a liveness
+    check and nothing but the request line is sent. Results (up and down) are cached in
+    cache_path for ttl seconds, so repeated runs only probe what expired or is new.
+    """
+
+    def __init__(self, cache_path=PROBE_CACHE, ttl=600, concurrency=64, per_host=16, timeout=4.0, drop=False):
+        self.cache_path, self.ttl, self.drop = cache_path, ttl, drop
+        self.concurrency, self.per_host, self.timeout = concurrency, per_host, timeout
+        self.cache = None
+        self.last = {'probed': 0, 'cached': 0, 'seconds': 0.0}
+
+    def _load_cache(self):
+        if self.cache is None:
+            try:
+                self.cache = json.loads(self.cache_path.read_text()) if self.cache_path else {}
+            except (OSError, ValueError):
+                self.cache = {}
+        return self.cache
+
+    async def _probe(self, url, tls):
+        import asyncio
+        u = urlsplit(url)
+        https = u.scheme == 'https'
+        port = u.port or (443 if https else 80)
+        path = (u.path or '/') + (f'?{u.query}' if u.query else '')
+        started = time.monotonic()
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(u.hostname, port, ssl=tls if https else None,
+                                        server_hostname=u.hostname if https else None),
+                self.timeout)
+            host = u.hostname if u.port is None else f'{u.hostname}:{u.port}'
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: homepage-generator-probe\r\n'
+                         f'Accept: */*\r\nConnection: close\r\n\r\n'.encode())
+            line = await asyncio.wait_for(reader.readline(), max(0.1, self.timeout - (time.monotonic() - started)))
+            ms = round((time.monotonic() - started) * 1000, 1)
+            parts = line.split()
+            if len(parts) < 2 or not parts[0].startswith(b'HTTP/') or not parts[1].isdigit():
+                return {'ok': False, 'status': None, 'ms': ms, 'error': 'not an HTTP response'}
+            status = int(parts[1])
+            return {'ok': status < 500, 'status': status, 'ms': ms, 'error': None if status < 500 else f'HTTP {status}'}
+        except asyncio.TimeoutError:
+            return {'ok': False, 'status': None, 'ms': None, 'error': f'timeout {self.timeout:g}s'}
+        except (OSError, UnicodeError, ValueError) as e:  # ssl.SSLError is an OSError
+            return {'ok': False, 'status': None, 'ms': None, 'error': type(e).__name__ + (f': {e.strerror}' if getattr(e, 'strerror', None) else '')}
+        finally:
+            if writer is not None:
+                writer.close()
+
+    async def _probe_all(self, urls):
+        import asyncio, ssl
+        tls = ssl.create_default_context()
+        tls.check_hostname = False
+        tls.verify_mode = ssl.CERT_NONE
+        overall = asyncio.Semaphore(self.concurrency)
+        hosts = {}
+
+        async def one(url):
+            host = (urlsplit(url).hostname or '').lower()
+            per_host = hosts.setdefault(host, asyncio.Semaphore(self.per_host))
+            async with per_host, overall:  # per-host first: a queue for one busy host must not hold global slots
+                return url, await self._probe(url, tls)
+
+        return dict(await asyncio.gather(*(one(u) for u in urls)))
+
+    def run(self, urls):
+        """{url: {'ok', 'status', 'ms', 'error', 'at'}} for every url, probing only uncached ones."""
+        cache, now = self._load_cache(), time.time()
+        fresh = {u: cache[u] for u in urls if u in cache and now - cache[u].get('at', 0) < self.ttl}
+        todo = sorted(set(urls) - set(fresh))
+        started = time.monotonic()
+        probed = {}
+        if todo:
+            import asyncio
+            probed = asyncio.run(self._probe_all(todo))
+        for r in probed.values():
+            r['at'] = now
+        cache.update(probed)
+        for u in [u for u, r in cache.items() if now - r.get('at', 0) >= self.ttl]:
+            del cache[u]
+        if probed and self.cache_path:
+            write_atomic(self.cache_path, json.dumps(cache, indent=1, sort_keys=True) + '\n')
+        self.last = {'probed': len(todo), 'cached': len(fresh), 'seconds': round(time.monotonic() - started, 2)}
+        return {**fresh, **probed}
+
+    def apply(self, items, groups):
+        """Probe every card's siteMonitor and annotate (or drop) dead ones in place; returns
+        {group: [(card name, result), ...]} for render_report."""
+        results = self.run(sorted({it['siteMonitor'] for it in items if it.get('siteMonitor')}))
+        by_group = {}
+        for group, arr in groups.items():
+            keep = []
+            for it in arr:
+                r = results.get(it.get('siteMonitor'))
+                if r is not None:
+                    by_group.setdefault(group, []).append((it['name'], r))
+                    if not r['ok']:
+                        if not self.drop:
+                            it['description'] += f" (probe: down, {r['error']})"
+                        elif it.get('source') == 'docker':
+                            it['href'] = it['siteMonitor'] = None
+                        else:
+                            continue
+                keep.append(it)
+            arr[:] = keep
+        for group in [g for g, arr in groups.items() if not arr]:
+            del groups[group]
+        items[:] = [it for arr in groups.values() for it in arr]
+        return by_group
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list."""
+    values = sorted(values)
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+# ---- Stage 3: render -----------------------------------------------------------
+
+def render_card(it):
+    sid = slug(it['group'] + '-' + it['name'])
+    lines = [f'    - {it["name"]}:', f'        id: {sid}', f'        icon: {it["icon"]}']
+    if it.get('href'):
+        lines.append(f'        href: {yaml_quote(it["href"])}')
+    lines.append(f'        description: {yaml_quote(it["description"])}')
+    if it.get('siteMonitor'):
+        lines.append(f'        siteMonitor: {yaml_quote(it["siteMonitor"])}')
+    if it.get('server') and it.get('container'):
+        lines.append(f'        server: {it["server"]}')
+        lines.append(f'        container: {yaml_quote(it["container"])}')
+        lines.append('        showStats: true')
+    return lines
+
+
+SERVICES_HEADER = ['---', '# Generated by scripts/generate-services-from-inventory.py', '# services.yaml-first catalog. Every running Docker container is connected via local-docker stats.', '# Secret-bearing widgets are intentionally not auto-enabled.', '']
+
+
+def render_group(group, arr):
+    lines = [f'- {group}:']
     for it in arr:
-        sid = slug(it['group'] + '-' + it['name'])
-        lines.append(f'    - {it["name"]}:')
-        lines.append(f'        id: {sid}')
-        lines.append(f'        icon: {it["icon"]}')
-        if it.get('href'):
-            lines.append(f'        href: {yaml_quote(it["href"])}')
-        lines.append(f'        description: {yaml_quote(it["description"])}')
-        if it.get('siteMonitor'):
-            lines.append(f'        siteMonitor: {yaml_quote(it["siteMonitor"])}')
-        if it.get('server') and it.get('container'):
-            lines.append(f'        server: {it["server"]}')
-            lines.append(f'        container: {yaml_quote(it["container"])}')
-            lines.append('        showStats: true')
+        lines.extend(render_card(it))
     lines.append('')
-text = '\n'.join(lines) + '\n'
-OUT.write_text(text)
-TEMPLATE_OUT.write_text(text)
-
-report = []
-report.append('# Stage 2 Service Catalog Report')
-report.append('')
-report.append('Generated by `scripts/generate-services-from-inventory.py`.')
-report.append('')
-report.append('## Summary')
-report.append('')
-report.append(f'- Running Docker containers connected: {len(docker_cards)}')
-report.append(f'- Total Homepage service cards generated: {len(items)}')
-report.append(f'- Groups generated: {len(groups)}')
-report.append(f'- Public NPM routes considered: {len(public_cards)}')
-report.append(f'- Heimdall safe-export cards considered: {len(heimdall_cards)}')
-report.append('')
-report.append('## Group counts')
-report.append('')
-for group in order:
-    if group in groups:
-        report.append(f'- {group}: {len(groups[group])}')
-report.append('')
-report.append('## Notes')
-report.append('')
-report.append('- Every running Docker container has `server: local-docker`, `container: <name>`, and `showStats: true`.')
-report.append('- Cards with known HTTP host ports or public reverse proxy routes include `href` and `siteMonitor`.')
-report.append('- Secret-bearing widgets were not auto-enabled; they require reviewed credentials in `.env`.')
-report.append('- NPM/Heimdall data is used only to enrich cards. Heimdall descriptions remain excluded by safe export.')
-REPORT.write_text('\n'.join(report) + '\n')
-
-print(f'wrote {OUT} with {len(items)} cards; docker={len(docker_cards)} groups={len(groups)}')
+    return lines
+
+
+def render_services(groups, order, blocks=None):
+    """blocks: optional pre-rendered render_group() lines per group (see LiveCatalog)."""
+    lines = list(SERVICES_HEADER)
+    for group in order:
+        arr = groups.get(group, [])
+        if not arr: continue
+        lines.extend(blocks[group] if blocks is not None else render_group(group, arr))
+    return '\n'.join(lines) + '\n'
+
+
+def render_report(docker_cards, public_cards, heimdall_cards, items, groups, order, probes=None):
+    report = []
+    report.append('# Stage 2 Service Catalog Report')
+    report.append('')
+    report.append('Generated by `scripts/generate-services-from-inventory.py`.')
+    report.append('')
+    report.append('## Summary')
+    report.append('')
+    report.append(f'- Running Docker containers connected: {len(docker_cards)}')
+    per_server = {}
+    for c in docker_cards:
+        per_server[c['server']] = per_server.get(c['server'], 0) + 1
+    if len(per_server) > 1:
+        report.append('- Docker hosts: ' + ', '.join(f'{s} ({n})' for s, n in per_server.items()))
+    report.append(f'- Total Homepage service cards generated: {len(items)}')
+    report.append(f'- Groups generated: {len(groups)}')
+    report.append(f'- Public NPM routes considered: {len(public_cards)}')
+    report.append(f'- Heimdall safe-export cards considered: {len(heimdall_cards)}')
+    report.append('')
+    report.append('## Group counts')
+    report.append('')
+    for group in order:
+        if group in groups:
+            report.append(f'- {group}: {len(groups[group])}')
+    report.append('')
+    if probes is not None:
+        report.extend(render_probe_table(probes, order))
+    report.append('## Notes')
+    report.append('')
+    report.append(f"- Every running Docker container has `server: {' / '.join(per_server) or 'local-docker'}`, `container: <name>`, and `showStats: true`.")
+    report.append('- Cards with known HTTP host ports or public reverse proxy routes include `href` and `siteMonitor`.')
+    report.append('- Secret-bearing widgets were not auto-enabled; they require reviewed credentials in `.env`.')
+    report.append('- NPM/Heimdall data is used only to enrich cards. Heimdall descriptions remain excluded by safe export.')
+    return '\n'.join(report) + '\n'
+
+
+def render_probe_table(probes, order):
+    lines = ['## siteMonitor probe', '', '| Group | Up | Down | p50 ms | p95 ms |', '|---|---:|---:|---:|---:|']
+    down = []
+    for group in order:
+        if group not in probes: continue
+        ms = [r['ms'] for _, r in probes[group] if r['ok'] and r['ms'] is not None]
+        up = sum(1 for _, r in probes[group] if r['ok'])
+        p50, p95 = (f'{percentile(ms, 50):.0f}', f'{percentile(ms, 95):.0f}') if ms else ('-', '-')
+        lines.append(f'| {group} | {up} | {len(probes[group]) - up} | {p50} | {p95} |')
+        down += [f'- {group} / {name}: {r["error"]}' for name, r in probes[group] if not r['ok']]
+    lines.append('')
+    if down:
+        lines += ['Down at generation time:', ''] + down + ['']
+    return lines
+
+
+def generate(npm_path=NPM_CSV, heimdall_path=HEIMDALL_JSON, docker_path=DOCKER_JSON, containers=None, probe=None,
+             inventories=None):
+    """Run every stage; returns (services_text, report_text, stats).
+    inventories: [(host, containers)] from load_inventories(); otherwise the single default host with
+    containers (readiness records, e.g. DockerAPI.containers()) or, failing that, docker_path.
+    probe: optional SiteProbe applied to the merged cards before rendering."""
+    public_by_endpoint, public_cards = load_npm(npm_path)
+    heimdall_cards = load_heimdall(heimdall_path)
+    if inventories is None:
+        inventories = [(default_host(docker_path), containers if containers is not None else load_containers(docker_path))]
+    docker_cards = load_docker(inventories, public_by_endpoint)
+    items, groups, order = merge_items(docker_cards, public_cards, heimdall_cards)
+    probes = probe.apply(items, groups) if probe else None
+    stats = {'cards': len(items), 'docker': len(docker_cards), 'groups': len(groups)}
+    return (render_services(groups, order),
+            render_report(docker_cards, public_cards, heimdall_cards, items, groups, order, probes),
+            stats)
+
+
+class LiveCatalog:
+    """Docker cards kept per container id, so an event re-reads only that container.
+
+    render() is not incremental: it re-merges every card (dedupe and name suffixes are
+    catalog-wide), compares every group's cards with the previous render and rebuilds the report.
+    Only the YAML of groups whose cards are unchanged is reused.
+    """
+
+    def __init__(self, npm_path=NPM_CSV, heimdall_path=HEIMDALL_JSON, probe=None, host=None):
+        self.probe = probe
+        self.host = host or default_host()
+        self.public_by_endpoint, self.public_cards = load_npm(npm_path)
+        self.heimdall_cards = load_heimdall(heimdall_path)
+        self.containers = {}  # id -> readiness record
+        self.cards = {}       # id -> docker card (running containers only)
+        self.blocks = {}      # group -> (cards signature, render_group lines)
+
+    def update(self, cid, container):
+        """Apply one container's current state (None: removed). True when its card changed."""
+        old = self.cards.pop(cid, None)
+        self.containers.pop(cid, None)
+        card = None
+        if container is not None:
+            self.containers[cid] = container
+            card = docker_card(container, self.public_by_endpoint, self.host)
+            if card:
+                self.cards[cid] = card
+        return card != old
+
+    def reset(self, containers):
+        """Full resync ({id: record}); only needed at startup and after the event stream drops."""
+        for cid in set(self.containers) - set(containers):
+            self.update(cid, None)
+        for cid, c in containers.items():
+            self.update(cid, c)
+
+    def digest(self):
+        records = sorted(self.containers.values(), key=lambda c: c['name'] or '')
+        return hashlib.sha256(json.dumps(records, sort_keys=True).encode()).hexdigest()
+
+    def render(self):
+        """Returns (services_text, report_text, stats, re-rendered group names)."""
+        docker_cards = sorted(self.cards.values(), key=lambda c: c['container'])
+        items, groups, order = merge_items(docker_cards, self.public_cards, self.heimdall_cards)
+        probes = self.probe.apply(items, groups) if self.probe else None
+        blocks, rendered = {}, []
+        for group in order:
+            arr = groups.get(group)
+            if not arr: continue
+            sig = tuple(tuple(sorted(it.items())) for it in arr)
+            cached = self.blocks.get(group)
+            if cached is None or cached[0] != sig:
+                cached = (sig, render_group(group, arr))
+                rendered.append(group)
+            blocks[group] = cached
+        self.blocks = blocks
+        stats = {'cards': len(items), 'docker': len(docker_cards), 'groups': len(groups)}
+        return (render_services(groups, order, {g: b[1] for g, b in blocks.items()}),
+                render_report(docker_cards, self.public_cards, self.heimdall_cards, items, groups, order, probes),
+                stats, rendered)
+
+
+def watch(api, catalog, publish, debounce=1.0):
+    """Follow container events forever; each debounced batch costs one filtered list call.
+
+    A reader thread queues a resync marker every time it (re)subscribes to /events, and the main
+    loop answers it with a full list: the first one is the initial load, and because it is taken
+    after subscribing nothing in between is missed. Events lost while the stream was down are
+    covered the same way after the reconnect.
+    """
+    events = queue.Queue()
+    RESYNC = None
+
+    def reader():
+        backoff = 1
+        while True:
+            try:
+                stream = api.events()
+                events.put(RESYNC)
+                backoff = 1
+                for ev in stream:
+                    events.put(ev)
+                print('docker event stream ended; reconnecting', file=sys.stderr)
+            except (OSError, ValueError) as e:
+                print(f'docker event stream failed ({e}); retrying in {backoff}s', file=sys.stderr)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    threading.Thread(target=reader, name='docker-events', daemon=True).start()
+    synced = False
+    while True:
+        batch = [events.get()]
+        deadline = time.monotonic() + debounce
+        while True:
+            try:
+                batch.append(events.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        try:
+            if RESYNC in batch or not synced:
+                catalog.reset(api.containers())
+                publish(catalog, 'resync' if synced else 'initial')
+                synced = True
+                continue
+            ids = {ev.get('Actor', {}).get('ID') or ev.get('id') for ev in batch} - {None}
+            current = api.containers(ids)
+            changed = [cid for cid in ids if catalog.update(cid, current.get(cid))]
+        except (OSError, ValueError) as e:
+            print(f'docker API error ({e}); will resync on the next event', file=sys.stderr)
+            synced = False
+            continue
+        actions = sorted({ev.get('Action') or ev.get('status') for ev in batch} - {None})
+        publish(catalog, f"{len(batch)} event(s) [{', '.join(actions)}], {len(changed)} card(s) changed")
+
+
+# ---- Change detection / output -------------------------------------------------
+
+def file_digest(path):
+    if not path.exists():
+        return 'missing'
+    h = hashlib.sha256()
+    with path.open('rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_stat(path):
+    """Cheap digest for large, frequently rewritten inputs (the readiness JSONs): size + mtime, no read."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return 'missing'
+    return f'{st.st_size}:{st.st_mtime_ns}'
+
+
+def fingerprint(inputs, extra=None):
+    """Per-input sha256 plus this script's own source, so generator edits also re-render.
+    extra: additional named digests (e.g. the live Docker container list)."""
+    parts = {str(p): file_digest(p) for p in inputs}
+    parts.update(extra or {})
+    parts[str(Path(__file__).resolve())] = file_digest(Path(__file__).resolve())
+    combined = hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+    return {'fingerprint': combined, 'inputs': parts}
+
+
+def read_fingerprint(path):
+    try:
+        return json.loads(path.read_text()).get('fingerprint')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def write_atomic(path, text):
+    """Write via a temp file in the same directory + os.replace (readers never see a partial file)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}.', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        else:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def write_if_changed(path, text):
+    try:
+        if path.read_text() == text:
+            return False
+    except OSError:
+        pass
+    write_atomic(path, text)
+    return True
+
+
+def write_outputs(args, text, report, fp):
+    """Write services.yaml (+ template copy), the report and the fingerprint; returns changed paths."""
+    changed = [p for p, content in ((args.out, text), (args.template_out, text), (args.report, report))
+               if write_if_changed(p, content)]
+    write_if_changed(args.fingerprint, json.dumps(fp, indent=2, sort_keys=True) + '\n')
+    return changed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Generate Homepage services.yaml from private inventory.')
+    ap.add_argument('--force', action='store_true', help='regenerate even if inputs are unchanged')
+    ap.add_argument('--out', type=Path, default=OUT)
+    ap.add_argument('--template-out', type=Path, default=TEMPLATE_OUT)
+    ap.add_argument('--report', type=Path, default=REPORT)
+    ap.add_argument('--fingerprint', type=Path, default=FINGERPRINT)
+    ap.add_argument('--hosts', type=Path, default=HOSTS_JSON, help='Docker hosts to aggregate (see load_hosts); default: the local host only')
+    ap.add_argument('--live', action='store_true', help='read containers from the Docker Engine API instead of the readiness JSON')
+    ap.add_argument('--watch', action='store_true', help='like --live, then keep re-rendering on container start/stop/die/rename events')
+    ap.add_argument('--docker-host', help='unix:///path/docker.sock or tcp://host:port (default: the docker-hosts.json socket, else $DOCKER_HOST or the local socket)')
+    ap.add_argument('--debounce', type=float, default=1.0, help='seconds to collect an event burst before re-rendering (--watch)')
+    ap.add_argument('--probe', action='store_true', help='check every siteMonitor URL first and annotate cards whose endpoint is down')
+    ap.add_argument('--probe-drop', action='store_true', help='with --probe: drop dead cards instead (Docker cards only lose href/siteMonitor)')
+    ap.add_argument('--probe-ttl', type=float, default=600, help='seconds a cached probe result stays valid')
+    ap.add_argument('--probe-concurrency', type=int, default=64)
+    ap.add_argument('--probe-per-host', type=int, default=16)
+    ap.add_argument('--probe-timeout', type=float, default=4.0)
+    ap.add_argument('--probe-cache', type=Path, default=PROBE_CACHE)
+    args = ap.parse_args(argv)
+    probe = None
+    if args.probe or args.probe_drop:
+        probe = SiteProbe(args.probe_cache, args.probe_ttl, max(1, args.probe_concurrency),
+                          max(1, args.probe_per_host), args.probe_timeout, drop=args.probe_drop)
+
+    def probe_summary():
+        if probe and probe.last['probed'] + probe.last['cached']:
+            print(f"  probed {probe.last['probed']} URL(s) in {probe.last['seconds']}s, {probe.last['cached']} from cache", flush=True)
+
+    if args.live or args.watch:
+        try:
+            hosts = load_hosts(args.hosts)
+        except (OSError, ValueError) as e:
+            print(f'docker hosts: {e}', file=sys.stderr)
+            return 1
+        if len(hosts) > 1:
+            ap.error(f'--live/--watch follow a single Docker host, but {args.hosts} lists {len(hosts)}; '
+                     'run without them to aggregate every host')
+        host = hosts[0]
+        docker_host = args.docker_host or (host['source'] if '://' in host['source'] else DOCKER_HOST)
+        try:
+            api = DockerAPI(docker_host)
+        except ValueError as e:
+            ap.error(str(e))
+        catalog = LiveCatalog(probe=probe, host=host)
+
+        def publish(catalog, why):
+            text, report, stats, rendered = catalog.render()
+            fp = fingerprint([NPM_CSV, HEIMDALL_JSON], {'docker-api': catalog.digest()})
+            changed = write_outputs(args, text, report, fp)
+            print(f'{why}: {stats["cards"]} cards; docker={stats["docker"]} groups={stats["groups"]}; '
+                  f're-rendered {len(rendered)} group(s){": " + ", ".join(rendered) if rendered else ""}'
+                  + ('' if changed else ' (content unchanged, nothing rewritten)'), flush=True)
+            probe_summary()
+
+        try:
+            if args.watch:
+                return watch(api, catalog, publish, args.debounce)
+            catalog.reset(api.containers())
+        except (OSError, ValueError) as e:
+            print(f'docker API {docker_host}: {e}', file=sys.stderr)
+            return 1
+        except KeyboardInterrupt:
+            return 0
+        publish(catalog, f'live {docker_host}')
+        return 0
+
+    # Only socket hosts have to be queried up front (their container list is the fingerprint);
+    # readiness JSONs are fingerprinted by stat and parsed only once we know we are rendering.
+    try:
+        hosts = load_hosts(args.hosts)
+        containers = {h['name']: cs for h, cs in load_inventories([h for h in hosts if '://' in h['source']])}
+    except (OSError, ValueError) as e:
+        # A missing host would silently drop its cards, so fail instead.
+        print(f'docker inventory: {e}', file=sys.stderr)
+        return 1
+    extra = {h['source']: hashlib.sha256(json.dumps(containers[h['name']], sort_keys=True).encode()).hexdigest()
+             if '://' in h['source'] else file_stat(Path(h['source'])) for h in hosts}
+    outputs = [args.out, args.template_out, args.report]
+    fp = fingerprint([NPM_CSV, HEIMDALL_JSON, args.hosts], extra)
+    # Probe results depend on the network, not the inputs: --probe always regenerates (the TTL cache keeps it cheap).
+    if not args.force and not probe and read_fingerprint(args.fingerprint) == fp['fingerprint'] and all(p.exists() for p in outputs):
+        print(f'inputs unchanged ({fp["fingerprint"][:12]}); nothing to do')
+        return 0
+
+    try:
+        containers.update((h['name'], cs) for h, cs in load_inventories([h for h in hosts if '://' not in h['source']]))
+    except (OSError, ValueError) as e:
+        print(f'docker inventory: {e}', file=sys.stderr)
+        return 1
+    inventories = [(h, containers[h['name']]) for h in hosts]
+    text, report, stats = generate(probe=probe, inventories=inventories)
+    changed = write_outputs(args, text, report, fp)
+    print(f'wrote {args.out} with {stats["cards"]} cards; docker={stats["docker"]} groups={stats["groups"]}'
+          + ('' if changed else ' (content unchanged, nothing rewritten)'))
+    for p in changed:
+        print(f'  updated {p}')
+    probe_summary()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())